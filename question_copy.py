@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-# Last Updated: 2025-08-22
+# Last Updated: 2026-10-14
 # Running this script will fill the unanswered questionnaire with the best matches from the reference questionnaire
 """
 Question Copy Script - Command-line version of tester.ipynb
@@ -29,6 +29,8 @@ Optional Arguments:
     --unans-answer-col      Unanswered questionnaire answer column (default: "Answer")
     --output               Output file name (default: "combined_questionnaire.xlsx")
     --skip-config-check    Skip config file validation (for testing purposes)
+    --use-batch-api        Send the matching requests through the OpenAI Batch API (cheaper, slower)
+    --candidate-count      Nearest reference questions kept per unmatched question (default: 5, 0 = all)
     --help                 Show this help message
 
 Examples:
@@ -42,8 +44,8 @@ Examples:
 import sys
 import argparse
 import os
-from dotenv import load_dotenv
-from src.Questionnaire_Filler import Questionnaire_Filler
+# dotenv and Questionnaire_Filler (which pulls in pandas, numpy and openai) are imported inside the
+# functions that use them, so --help and argument errors return without loading them
 ################################### IMPORTS #############################################
 
 # Add the current directory to the Python path
@@ -51,6 +53,7 @@ sys.path.insert(0, '.')
 
 def validate_config():
     """Validate that the config.env file exists and contains required variables."""
+    from dotenv import load_dotenv
     
     # List of possible config file locations
     config_paths = ['config.env', '../config.env', './config.env']
@@ -145,6 +148,19 @@ def main():
     parser.add_argument('--skip-config-check',
                        action='store_true',
                        help='Skip config file validation (for testing purposes)')
+    parser.add_argument('--use-batch-api',
+                       action='store_true',
+                       help='Send the matching requests through the OpenAI Batch API (cheaper, slower)')
+    parser.add_argument('--candidate-count',
+                       type=int,
+                       default=5,
+                       help='Nearest reference questions kept per unmatched question before AI matching (default: 5, 0 = all)')
+    parser.add_argument('--model',
+                       default='gpt-4o-mini',
+                       help='Model used for question matching and answer scoring (default: "gpt-4o-mini")')
+    parser.add_argument('--escalation-model',
+                       default='gpt-4o',
+                       help='Model that re-checks uncertain question matches (default: "gpt-4o", "none" = disabled)')
     
     # Parse arguments
     args = parser.parse_args()
@@ -175,6 +191,9 @@ def main():
     print(f"📊 Output file: {args.output}")
     print()
     
+    # Import the filler only now that the arguments and files have been validated
+    from src.Questionnaire_Filler import Questionnaire_Filler
+
     try:
         # Initialize the questionnaire filler
         print("🔧 Initializing Questionnaire Filler...")
@@ -184,7 +203,11 @@ def main():
             reference_answer_col=args.ref_answer_col,
             unanswered_file_name=args.unanswered_file,
             unanswered_question_col=args.unans_question_col,
-            unanswered_answer_col=args.unans_answer_col
+            unanswered_answer_col=args.unans_answer_col,
+            default_model=args.model,
+            escalation_model=None if args.escalation_model.lower() == 'none' else args.escalation_model,
+            use_batch_api=args.use_batch_api,
+            candidate_count=args.candidate_count
         )
         
         # Fill the questionnaire with matched answers
@@ -0,0 +1,142 @@
+# Last Updated: 2026-10-14
+# Description: A disk-backed cache of question embeddings for Compliance team.
+#              (1) Stores one embedding per (model, cleaned question) hash in a SQLite table.
+#              (2) Lets repeat runs skip re-embedding questions that have been seen before.
+
+################################################################################
+# Imports
+################################################################################
+import hashlib
+import os
+import sqlite3
+import numpy as np
+
+################################################################################
+# Constants
+################################################################################
+
+# Default location of the embeddings cache
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "question_copy", "embeddings.sqlite")
+
+# Stays below SQLite's limit on the number of "?" placeholders in a single query
+_MAX_QUERY_VARIABLES = 500
+
+################################################################################
+# Embedding Cache Class
+################################################################################
+
+"""
+Purpose: Persists question embeddings between runs, keyed by a hash of the embedding model and question text.
+
+Attributes:
+    cache_path (str): Path to the SQLite database file.
+    dtype (np.dtype): The dtype embeddings are stored in.
+
+Methods:
+    get_many(texts, embedding_model): Look up the cached embeddings for a list of texts.
+    put_many(texts, embeddings, embedding_model): Store embeddings for a list of texts.
+"""
+class Embedding_Cache(object):
+
+    """Initialize the Embedding_Cache class.
+
+        Args:
+            cache_path (str, optional): Path to the SQLite database file. The file is created on first use.
+            dtype (np.dtype, optional): The dtype embeddings are stored in.
+    """
+    def __init__(self, cache_path=DEFAULT_CACHE_PATH, dtype=np.float16):
+
+        # Sets class attributes
+        self.cache_path = cache_path
+        self.dtype = np.dtype(dtype)
+        self._connection = None
+
+
+
+    """Opens the database connection and creates the table on first use.
+
+        Returns:
+            sqlite3.Connection: The database connection.
+    """
+    def _connect(self):
+
+        # Creates the connection only once
+        if (self._connection is None):
+            cache_dir = os.path.dirname(self.cache_path)
+            if (cache_dir):
+                os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+            self._connection = sqlite3.connect(self.cache_path)
+            self._connection.execute("CREATE TABLE IF NOT EXISTS embeddings (hash BLOB PRIMARY KEY, vec BLOB)")
+
+        # Returns the connection
+        return self._connection
+
+
+
+    """Hashes a text together with the embedding model and storage dtype of its vector.
+
+        Args:
+            text (str): The cleaned question text.
+            embedding_model (str): The embedding model name.
+
+        Returns:
+            bytes: The 16-byte blake2b digest.
+    """
+    def _hash(self, text, embedding_model):
+        return hashlib.blake2b(f"{embedding_model}\n{self.dtype.name}\n{text}".encode("utf-8"), digest_size=16).digest()
+
+
+
+    """Look up the cached embeddings for a list of texts.
+
+        Args:
+            texts (list): The cleaned question texts.
+            embedding_model (str): The embedding model name.
+
+        Returns:
+            dict: Maps each text found in the cache to its embedding. Texts that are not cached are omitted.
+    """
+    def get_many(self, texts, embedding_model):
+
+        # Maps each hash back to its text
+        text_by_hash = {self._hash(text, embedding_model): text for text in texts}
+        hashes = list(text_by_hash)
+        found = {}
+
+        # Looks up the hashes in as few queries as possible, treating any database error as a cache miss
+        try:
+            connection = self._connect()
+            for start in range(0, len(hashes), _MAX_QUERY_VARIABLES):
+                chunk = hashes[start:start + _MAX_QUERY_VARIABLES]
+                placeholders = ",".join("?" * len(chunk))
+                rows = connection.execute(f"SELECT hash, vec FROM embeddings WHERE hash IN ({placeholders})", chunk)
+                for text_hash, vec in rows:
+                    found[text_by_hash[text_hash]] = np.frombuffer(vec, dtype=self.dtype)
+        except (sqlite3.Error, OSError) as e:
+            print(f"Warning: could not read embeddings cache {self.cache_path}: {e}")
+
+        # Returns the cached embeddings
+        return found
+
+
+
+    """Store embeddings for a list of texts.
+
+        Args:
+            texts (list): The cleaned question texts.
+            embeddings (np.ndarray): A (len(texts), d) array of embeddings.
+            embedding_model (str): The embedding model name.
+    """
+    def put_many(self, texts, embeddings, embedding_model):
+
+        # Serializes the vectors as raw bytes in the storage dtype
+        rows = [(self._hash(text, embedding_model), np.asarray(vec, dtype=self.dtype).tobytes())
+                for text, vec in zip(texts, embeddings)]
+
+        # Writes every row in one transaction, treating any database error as non-fatal
+        try:
+            connection = self._connect()
+            with connection:
+                connection.executemany("INSERT OR REPLACE INTO embeddings (hash, vec) VALUES (?, ?)", rows)
+        except (sqlite3.Error, OSError) as e:
+            print(f"Warning: could not write embeddings cache {self.cache_path}: {e}")
@@ -1,4 +1,4 @@
-# Last Updated: 2025-08-22
+# Last Updated: 2026-10-14
 # Description: A class for storing questions to fill out an unanswered questionnaire for Compliance team.
 
 ################################################################################
@@ -22,6 +22,15 @@ Methods:
 """
 class Question(object):
 
+    # Declares the attributes up front so instances carry no per-object __dict__
+    __slots__ = ("question",
+                 "answer",
+                 "question_id",
+                 "is_reference",
+                 "reference_question",
+                 "question_match_score",
+                 "answer_match_score")
+
     """Initialize the Question class.
         
         Args:
@@ -1,21 +1,51 @@
-# Last Updated: 2025-08-22
+# Last Updated: 2026-10-14
 # Description: A class for reading an unanswered questionnaire for Compliance team.
 
 ################################################################################
 # Imports
 ################################################################################
 import pandas as pd
+import numpy as np
 from .Question import Question
+from .concurrency import run_coroutine, gather_bounded
+from .similarity import normalize_rows
+import asyncio
+import functools
 import unicodedata
-import re
 import os
+import sys
+from types import MappingProxyType
+
+# Optional: pyarrow's multithreaded CSV reader (pandas' reader is used when it is not installed) and its Parquet reader
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pacompute
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as paparquet
+except ImportError:
+    pa = None
+    pacompute = None
+    pacsv = None
+    paparquet = None
+
+# Optional: the Rust calamine Excel reader, openpyxl is used when it is not installed
+try:
+    import python_calamine
+except ImportError:
+    python_calamine = None
 
 ################################################################################
 # Constants
 ################################################################################
 
-# Compile once for performance
-_SPACE_RE = re.compile(r"\s+")
+# Maximum number of texts sent in a single embeddings request (the endpoint accepts up to 2048)
+EMBEDDING_BATCH_SIZE = 1000
+
+# Maximum number of embeddings requests in flight at once
+MAX_CONCURRENT_EMBEDDING_REQUESTS = 8
+
+# Stored embeddings are unit-length float16: half the memory of float32 with negligible cosine error
+EMBEDDING_DTYPE = np.float16
 
 ################################################################################
 # Questionnaire Class
@@ -27,13 +57,18 @@ Purpose: Superclass for the "Reference_Questionnaire" and "Unanswered_Questionna
 Attributes:
     file_path (str): Path to the CSV file to read.
     data (pd.DataFrame): The loaded data as a pandas DataFrame.
-    questions (dict): A dictionary of Question objects contained within the file.
+    questions (dict): A dictionary of Question objects contained within the file, keyed by cleaned question text.
     question_col (str): The column name for the questions.
     answer_col (str): The column name for the answers.
     is_reference (bool): A boolean flag for whether the questionnaire is a reference questionnaire.
+    question_texts (np.ndarray): Columnar array of the question texts, in the same order as questions.
+    embeddings (np.ndarray): The (N, d) unit-length float16 question embeddings, in the same order as questions. None until requested.
+    duplicate_ids (list): The row IDs of repeated questions replaced by a later row.
+    question_positions (dict): Maps each question text to its position in question_texts. None until requested.
 
 Methods:
     read_csv(file_path=None): Read a CSV file into a pandas DataFrame.
+    get_embeddings(embedding_client, embedding_model, embedding_cache): Embed all questions with a single batched request.
 """
 class Questionnaire(object):
 
@@ -54,9 +89,13 @@ class Questionnaire(object):
         self.file_path = file_path
         self.data = None
         self.questions = dict()
+        self.question_texts = np.empty(0, dtype=object)
         self.question_col = question_col
         self.answer_col = answer_col
         self.is_reference = is_reference
+        self.embeddings = None
+        self.duplicate_ids = []
+        self.question_positions = None
 
         # Reads in the data
         self._read_file()
@@ -77,18 +116,23 @@ class Questionnaire(object):
         if (self.file_path == None):
             raise ValueError("ERROR: No File Type Specified")
         
-        # Check if file exists
-        if not os.path.exists(self.file_path):
-            raise FileNotFoundError(f"ERROR: File not found: {self.file_path}")
+        # Checks that the file exists with a single stat call
+        try:
+            os.stat(self.file_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"ERROR: File not found: {self.file_path}") from None
         
         # Sets self.data to the data from the file
         try:
             if self.file_path.endswith(".csv"):
-                self.data = pd.read_csv(self.file_path)
+                self.data = self._read_csv()
             elif self.file_path.endswith(".xlsx"):
-                self.data = pd.read_excel(self.file_path)
+                self.data = pd.read_excel(self.file_path, engine="calamine" if python_calamine is not None else "openpyxl",
+                                          usecols=self._is_used_column, dtype=str, na_filter=False)
+            elif self.file_path.endswith(".parquet"):
+                self.data = self._read_parquet()
             else:
-                raise ValueError("ERROR: File Type Not Supported. Only .csv and .xlsx files are supported.")
+                raise ValueError("ERROR: File Type Not Supported. Only .csv, .xlsx and .parquet files are supported.")
         except FileNotFoundError:
             raise  # Re-raise FileNotFoundError as-is
         except Exception as e:
@@ -96,6 +140,95 @@ class Questionnaire(object):
         
 
 
+    """Checks whether a column is one of the question or answer columns.
+
+        Args:
+            column (str): The column name.
+
+        Returns:
+            bool: True if the column is read from the file, False otherwise.
+    """
+    def _is_used_column(self, column):
+        return column in (self.question_col, self.answer_col)
+
+
+
+    """Reads the question and answer columns of a CSV file as strings, using pyarrow's multithreaded parser when it is installed.
+
+        Returns:
+            pd.DataFrame: The data from the CSV file.
+    """
+    def _read_csv(self):
+
+        # Uses pyarrow when it is installed and accepts the file, the pandas C reader otherwise
+        if (pacsv is not None):
+            table = self._read_csv_pyarrow()
+            if (table is not None):
+                return table.to_pandas()
+
+        # Reads with pandas (other columns are skipped, nothing is type-inferred and short rows are padded with empty strings)
+        return pd.read_csv(self.file_path, usecols=self._is_used_column, dtype=str, engine="c", na_filter=False)
+
+
+
+    """Reads the question and answer columns of a CSV file with pyarrow's multithreaded parser.
+
+        Returns:
+            pa.Table: The two columns as non-null strings, or None if pyarrow cannot read the file like pandas would.
+    """
+    def _read_csv_pyarrow(self):
+        read_options = pacsv.ReadOptions(use_threads=True)
+        parse_options = pacsv.ParseOptions(newlines_in_values=True)  # Quoted values may span multiple lines
+
+        try:
+            # Reads the header with the same parser, so the column names match the ones it will select
+            with pa.memory_map(self.file_path, "r") as source:
+                header = pacsv.open_csv(source, read_options=read_options, parse_options=parse_options).schema.names
+            used_columns = [column for column in header if self._is_used_column(column)]
+
+            # Leaves files without the columns (an empty selection means every column) and repeated column names
+            # (which pandas renames) to pandas, so the errors and results stay the same
+            if (not used_columns or len(set(used_columns)) != len(used_columns)):
+                return None
+
+            # Parses just those columns across threads as non-null strings, straight from a memory map of the file
+            with pa.memory_map(self.file_path, "r") as source:
+                return pacsv.read_csv(source,
+                                      read_options=read_options,
+                                      parse_options=parse_options,
+                                      convert_options=pacsv.ConvertOptions(include_columns=used_columns,
+                                                                           column_types={column: pa.string() for column in used_columns},
+                                                                           strings_can_be_null=False))
+
+        # Leaves the rows pyarrow rejects, such as short rows that pandas pads, to pandas
+        except pa.ArrowInvalid:
+            return None
+
+
+
+    """Reads the question and answer columns of a Parquet file as strings, like the CSV and Excel readers.
+
+        Returns:
+            pd.DataFrame: The data from the Parquet file.
+    """
+    def _read_parquet(self):
+
+        # Raises an error if pyarrow is not installed
+        if (paparquet is None):
+            raise ImportError("ERROR: Reading .parquet files requires pyarrow")
+
+        # Reads only the schema to find which of the two columns are present (missing ones are reported by _build_questions)
+        used_columns = [column for column in paparquet.read_schema(self.file_path).names if self._is_used_column(column)]
+
+        # Reads just those columns, converting numbers and other native types to text and missing values to empty strings
+        table = paparquet.read_table(self.file_path, columns=used_columns)
+        text_columns = {column: pacompute.fill_null(table.column(column).cast(pa.string()), "") for column in used_columns}
+
+        # Returns the data as a pandas DataFrame
+        return pa.table(text_columns).to_pandas()
+
+
+
     """Get the loaded data.
         
         Returns:
@@ -122,17 +255,39 @@ class Questionnaire(object):
     """
     def _clean_question(self, text: str) -> str:
 
-        # Unicode normalization
-        text = unicodedata.normalize("NFKC", text)
+        # Unicode normalization (a no-op for pure ASCII text, which is the common case)
+        if (not text.isascii()):
+            text = unicodedata.normalize("NFKC", text)
+
+        # Collapses all whitespace and strips outer spaces (str.split() does both in a single C loop)
+        text = " ".join(text.split())
+
+        # Interns the result so repeated questions share one string and compare by identity
+        return sys.intern(text)
+
+
 
-        # Collapse all whitespace
-        text = _SPACE_RE.sub(" ", text)
+    """Vectorized version of _clean_question that cleans a whole column at once.
 
-        # Strip outer spaces
-        text = text.strip()
+    Args:
+        column (pd.Series): The column of question text to clean.
+
+    Returns:
+        pd.Series: The cleaned question text.
+    """
+    def _clean_question_column(self, column: pd.Series) -> pd.Series:
 
-        # Returns the cleaned text
-        return text
+        # Unicode-normalizes only the rows that contain non-ASCII characters (astype returns a copy, so this never edits self.data)
+        column = column.astype(str)
+        non_ascii = ~column.map(str.isascii).to_numpy(dtype=bool)
+        if (non_ascii.any()):
+            column[non_ascii] = column[non_ascii].str.normalize("NFKC")
+
+        # Collapses the whitespace over the whole column in pandas' string methods
+        cleaned = column.str.split().str.join(" ")
+
+        # Interns the results so repeated questions share one string and compare by identity
+        return cleaned.map(sys.intern)
 
 
 
@@ -150,32 +305,197 @@ class Questionnaire(object):
         if self.answer_col not in self.data.columns:
             raise KeyError(f"ERROR: Answer column '{self.answer_col}' not found in file. Available columns: {list(self.data.columns)}")
         
-        # Stores the questions and answers in a list of Question objects
-        for index, row in self.data.iterrows():
+        # Collects the cleaned questions and answers column-wise instead of row-by-row
+        # (the index stays a list so question IDs remain plain Python ints)
+        idx_arr = self.data.index.tolist()
+        questions_arr = self._clean_question_column(self.data[self.question_col]).to_numpy()
+        answers_arr = self.data[self.answer_col].to_numpy()
 
-            # Stores the current question
-            curr_question = row[self.question_col]
+        # Flags the usable answers (present and not just whitespace) for the whole column at once
+        answer_valid = ~pd.isna(answers_arr) & (pd.Series(answers_arr, dtype=object).astype(str).str.strip() != "").to_numpy()
 
-            # Cleans the question
-            curr_question = self._clean_question(curr_question)
+        # Stores the questions and answers in a dictionary of Question objects
+        duplicate_ids = self.duplicate_ids
+        for index, curr_question, answer_value, is_valid in zip(idx_arr, questions_arr, answers_arr, answer_valid):
 
-            # Creates a new Question object
+            # Creates a new Question object, with the answer if there is one (set directly to skip a method call per row)
             question_obj = Question(curr_question, index, is_reference=self.is_reference)
+            if (is_valid):
+                question_obj.answer = answer_value
 
-            # If reference questionnaire, sets the answer for the question
-            answer_value = row[self.answer_col]
-            if (answer_value is not None and not pd.isna(answer_value) and str(answer_value).strip() != ""):
-                question_obj.set_answer(answer_value)
-
-            # Adds the question to the dictionary
+            # Adds the question to the dictionary (a repeated question replaces the earlier row)
+            replaced = self.questions.get(curr_question)
+            if (replaced is not None):
+                duplicate_ids.append(replaced.question_id)
             self.questions[curr_question] = question_obj
 
+        # Warns about repeated questions instead of dropping them silently
+        self._warn_duplicates()
+
+        # Stores the question texts column-wise so they can be batch-processed (e.g. embedded together)
+        self.question_texts = np.empty(len(self.questions), dtype=object)
+        for position, question_obj in enumerate(self.questions.values()):
+            self.question_texts[position] = question_obj.get_question()
+
+
+
+    """Warns about the repeated questions that were replaced by a later row.
+
+        Returns:
+            N/A (Prints a warning when there are duplicates)
+    """
+    def _warn_duplicates(self):
+        duplicate_ids = self.duplicate_ids
+        if (duplicate_ids):
+            print(f"Warning: {len(duplicate_ids)} duplicate question(s) in {self.file_path}, keeping the last occurrence "
+                  f"(dropped rows {duplicate_ids[:10]}{'...' if len(duplicate_ids) > 10 else ''})")
+
+
+
+    """Sends several embedding requests concurrently, with a bounded number in flight.
+
+        Args:
+            batches (list): Lists of texts, one list per request.
+            embedding_client (OpenAI): The client used to call the embeddings endpoint.
+            embedding_model (str): The embedding model to use.
+
+        Returns:
+            list: The embedding responses, in the same order as batches.
+    """
+    async def _embed_batches_async(self, batches, embedding_client, embedding_model):
+
+        # Runs each blocking request in the default thread pool so the requests overlap
+        loop = asyncio.get_running_loop()
+        factories = [functools.partial(loop.run_in_executor, None,
+                                       functools.partial(embedding_client.embeddings.create, model=embedding_model, input=batch))
+                     for batch in batches]
+
+        # Returns the responses once every request has finished
+        return await gather_bounded(factories, MAX_CONCURRENT_EMBEDDING_REQUESTS)
+
+
+
+    """Embeds a list of texts with as few requests to the embeddings endpoint as possible.
+
+        Args:
+            texts (list): The texts to embed.
+            embedding_client (OpenAI): The client used to call the embeddings endpoint.
+            embedding_model (str): The embedding model to use.
+
+        Returns:
+            np.ndarray: A (N, d) float32 array with one embedding per text.
+    """
+    def _embed_batch(self, texts, embedding_client, embedding_model):
+
+        # Returns an empty array if there is nothing to embed
+        if (len(texts) == 0):
+            return np.empty((0, 0), dtype=np.float32)
+
+        # Splits the texts into batches the endpoint accepts in a single request
+        batches = [texts[start:start + EMBEDDING_BATCH_SIZE] for start in range(0, len(texts), EMBEDDING_BATCH_SIZE)]
+
+        # Sends a single request when possible, otherwise dispatches the batches concurrently
+        if (len(batches) == 1):
+            responses = [embedding_client.embeddings.create(model=embedding_model, input=batches[0])]
+        else:
+            responses = run_coroutine(self._embed_batches_async(batches, embedding_client, embedding_model))
+
+        # Orders each batch's embeddings by their input position and stacks them into one array
+        embeddings = [item.embedding
+                      for response in responses
+                      for item in sorted(response.data, key=lambda item: item.index)]
+        return np.asarray(embeddings, dtype=np.float32)
+
+
+
+    """Normalizes embeddings to unit length and stores them in the compact embedding dtype.
+
+        Args:
+            embeddings (np.ndarray): A (N, d) float32 array of embeddings.
+
+        Returns:
+            np.ndarray: A (N, d) unit-length float16 array.
+    """
+    def _compress_embeddings(self, embeddings):
+
+        # Normalizes in float32 before downcasting so the rounding error stays small
+        if (embeddings.size == 0):
+            return embeddings.astype(EMBEDDING_DTYPE)
+        return normalize_rows(embeddings).astype(EMBEDDING_DTYPE)
+
+
+
+    """Embeds a list of texts, reusing cached embeddings and only requesting the misses.
+
+        Args:
+            texts (list): The texts to embed.
+            embedding_client (OpenAI): The client used to call the embeddings endpoint.
+            embedding_model (str): The embedding model to use.
+            embedding_cache (Embedding_Cache): The persistent embeddings cache.
+
+        Returns:
+            np.ndarray: A (N, d) unit-length float16 array with one embedding per text.
+    """
+    def _embed_with_cache(self, texts, embedding_client, embedding_model, embedding_cache):
+
+        # Looks up every text in the cache at once
+        embeddings_by_text = embedding_cache.get_many(texts, embedding_model)
+
+        # Embeds only the texts that are not cached yet (in one batched request) and stores them
+        misses = [text for text in dict.fromkeys(texts) if text not in embeddings_by_text]
+        if (len(misses) > 0):
+            new_embeddings = self._compress_embeddings(self._embed_batch(misses, embedding_client, embedding_model))
+            embedding_cache.put_many(misses, new_embeddings, embedding_model)
+            embeddings_by_text.update(zip(misses, new_embeddings))
+
+        # Returns the embeddings in the same order as the texts
+        if (len(texts) == 0):
+            return np.empty((0, 0), dtype=EMBEDDING_DTYPE)
+        return np.vstack([embeddings_by_text[text] for text in texts]).astype(EMBEDDING_DTYPE, copy=False)
+
+
+
+    """Get the question embeddings, embedding every question in one batched request on first use.
+
+        Args:
+            embedding_client (OpenAI): The client used to call the embeddings endpoint.
+            embedding_model (str, optional): The embedding model to use.
+            embedding_cache (Embedding_Cache, optional): A persistent cache to reuse embeddings from previous runs.
+
+        Returns:
+            np.ndarray: A (N, d) unit-length float16 array of embeddings in the same order as get_questions().
+    """
+    def get_embeddings(self, embedding_client, embedding_model="text-embedding-3-small", embedding_cache=None):
+
+        # Embeds the questions only once per questionnaire
+        if (self.embeddings is None):
+            texts = self.question_texts.tolist()
+            if (embedding_cache is None):
+                self.embeddings = self._compress_embeddings(self._embed_batch(texts, embedding_client, embedding_model))
+            else:
+                self.embeddings = self._embed_with_cache(texts, embedding_client, embedding_model, embedding_cache)
+
+        # Returns the embeddings
+        return self.embeddings
+
+
+
+    """Get the position of every question in question_texts (and in the embeddings), building the map on first use.
+
+        Returns:
+            dict: Maps each question text to its position.
+    """
+    def get_question_positions(self):
+        if (self.question_positions is None):
+            self.question_positions = {text: position for position, text in enumerate(self.question_texts)}
+        return self.question_positions
+
 
 
     """Get the questions.
         
         Returns:
-            questions (dict): The questions.
+            questions (MappingProxyType): A read-only view of the questions, keyed by question text.
     """
     def get_questions(self):
-        return self.questions
\ No newline at end of file
+        return MappingProxyType(self.questions)
@@ -1,4 +1,4 @@
-# Last Updated: 2025-08-28
+# Last Updated: 2026-10-14
 # Description: A class for managing reference and unanswered questionnaires for Compliance team.
 #              (1) Creates Reference_Questionnaire and Unanswered_Questionnaire objects.
 #              (2) Matches questions to the reference questionnaire.
@@ -6,15 +6,183 @@
 ################################################################################
 # Imports
 ################################################################################
-from .Reference_Questionnaire import Reference_Questionnaire
+from .Reference_Questionnaire import Reference_Questionnaire, DEFAULT_REFERENCE_CACHE_DIR
 from .Unanswered_Questionnaire import Unanswered_Questionnaire
-from openai import OpenAI
-import httpx
+from .Embedding_Cache import Embedding_Cache, DEFAULT_CACHE_PATH
+from .Response_Cache import Response_Cache, DEFAULT_RESPONSE_CACHE_PATH
+from .concurrency import run_coroutine, gather_bounded
+from .local_scoring import local_answer_score
+import asyncio
+import functools
+import io
 import json
 import os
+import re
+import time
 from dotenv import load_dotenv
 import pandas as pd
-from openpyxl.styles import PatternFill, Alignment
+import numpy as np
+
+# xlsxwriter writes styled workbooks much faster than openpyxl, which is still used when it is not installed
+try:
+    import xlsxwriter
+    from xlsxwriter.utility import xl_col_to_name
+except ImportError:
+    xlsxwriter = None
+
+################################################################################
+# Constants
+################################################################################
+
+# OpenAI Batch API settings (batches are billed at about half the synchronous price)
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_POLL_INTERVAL = 30
+BATCH_FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+# Number of times the OpenAI client retries rate limited, timed out and server error responses with exponential backoff
+AI_MAX_RETRIES = 4
+
+# Maximum number of chat requests in flight at once
+MAX_CONCURRENT_AI_REQUESTS = 8
+
+# Token limit of each question matching response (a single match per response)
+QUESTION_MATCHING_MAX_TOKENS = 200
+
+# Number of answer pairs scored per request, small enough that no response nears its token limit
+ANSWER_MATCHING_CHUNK_SIZE = 20
+
+# Longest answer text sent for scoring, capping the prompt cost of long free-text answers
+MAX_SCORED_ANSWER_LENGTH = 500
+
+# Compact JSON separators for request payloads (the default ", " and ": " only add prompt tokens)
+_COMPACT_JSON_SEPARATORS = (",", ":")
+
+# Structured output schema for the question matching responses (one unmatched question per response)
+QUESTION_MATCH_SCHEMA = {
+    "name": "question_match",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "match": {
+                "anyOf": [
+                    {
+                        "type": "object",
+                        "properties": {
+                            "matched_question": {"type": "string"},
+                            "similarity": {"type": "number"}
+                        },
+                        "required": ["matched_question", "similarity"],
+                        "additionalProperties": False
+                    },
+                    {"type": "null"}
+                ]
+            },
+            "no_match": {"type": "boolean"}
+        },
+        "required": ["match", "no_match"],
+        "additionalProperties": False
+    }
+}
+
+# Structured output schema for the answer matching responses
+ANSWER_SCORES_SCHEMA = {
+    "name": "answer_scores",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "results": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "q": {"type": "string"},
+                        "s": {"type": "number"}
+                    },
+                    "required": ["q", "s"],
+                    "additionalProperties": False
+                }
+            }
+        },
+        "required": ["results"],
+        "additionalProperties": False
+    }
+}
+
+# Question matches whose similarity falls in [low, high) are re-checked with the escalation model
+ESCALATION_SIMILARITY_RANGE = (0.4, 0.7)
+
+# Write buffer size for the combined questionnaire CSV output
+CSV_WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Combined questionnaire sheet layout, keyed by column name (the column letters are derived from each column's position)
+COMBINED_SHEET_NAME = "Combined Questionnaire"
+TEXT_COLUMN_WIDTH = 30
+NUMBER_COLUMN_WIDTH = 12
+COMBINED_COLUMN_WIDTHS = {
+    "Current Question": TEXT_COLUMN_WIDTH,
+    "Matched Question": TEXT_COLUMN_WIDTH,
+    "Matched Question Row": NUMBER_COLUMN_WIDTH,
+    "Question Match Score": NUMBER_COLUMN_WIDTH,
+    "Current Answer": TEXT_COLUMN_WIDTH,
+    "Matched Answer": TEXT_COLUMN_WIDTH,
+    "Answer Match Score": NUMBER_COLUMN_WIDTH
+}
+SCORE_COLUMNS = ("Question Match Score", "Answer Match Score")
+LOW_SCORE_COLOR = "FFC0CB"
+LOW_SCORE_ARGB = "FF" + LOW_SCORE_COLOR  # openpyxl reads a 6-digit color as fully transparent ARGB
+
+# Locations searched for the config file, in order
+CONFIG_PATHS = ['config.env', '../config.env', './config.env']
+
+# Whether the config file has been loaded in this process
+_CONFIG_LOADED = False
+
+# Punctuation ignored when comparing questions for an exact match
+_PUNCTUATION_PATTERN = re.compile(r"[^\w\s]+")
+
+# A letter or digit in any script (\w without the underscore)
+_ALPHANUMERIC_PATTERN = re.compile(r"[^\W_]")
+
+# String representations of missing values that do not count as content
+_NULL_STRINGS = frozenset(["nan", "none", "null", ""])
+
+################################################################################
+# Helper Functions
+################################################################################
+
+"""Loads the environment variables from the first config.env found, once per process."""
+def _load_config():
+    global _CONFIG_LOADED
+
+    # Loads environment variables - try multiple paths
+    if (not _CONFIG_LOADED):
+        for config_path in CONFIG_PATHS:
+            if os.path.exists(config_path):
+                load_dotenv(config_path)
+                break
+        _CONFIG_LOADED = True
+
+
+"""Checks whether a string contains meaningful content (letters or numbers).
+
+    Args:
+        text_str (str): The string to check.
+
+    Returns:
+        bool: True if the string contains a letter or digit and is not a null placeholder, False otherwise.
+"""
+@functools.lru_cache(maxsize=4096)
+def _string_has_meaningful_content(text_str):
+
+    # Rejects string representations of NaN/null values
+    if (text_str.lower() in _NULL_STRINGS):
+        return False
+
+    # Returns True if the text contains a letter or digit (a single C-level regex scan), False otherwise
+    return _ALPHANUMERIC_PATTERN.search(text_str) is not None
 
 ################################################################################
 # Questionnaire Filler Class
@@ -29,7 +197,7 @@ Attributes:
     ai_client: The OpenAI client.
 
 Methods:
-    N/A
+    from_questionnaires(reference_questionnaire, unanswered_questionnaire, **kwargs): Create a filler from loaded questionnaires.
 """
 class Questionnaire_Filler(object):
 
@@ -42,8 +210,29 @@ class Questionnaire_Filler(object):
             unanswered_file_name (str): Path to the unanswered questionnaire file.
             unanswered_question_col (str): Column name for questions in unanswered file.
             unanswered_answer_col (str): Column name for answers in unanswered file.
+            default_model (str, optional): Model used for the matching and scoring tasks.
+            matching_model (str, optional): Model used for question matching. Defaults to default_model.
+            scoring_model (str, optional): Model used for answer scoring. Defaults to default_model.
+            escalation_model (str, optional): Stronger model that re-checks uncertain question matches.
+                Set to None to keep every match from the matching model.
             ai_url (str, optional): AI API base URL. If not provided, uses CHATAI_BASE_URL from config.env.
             api_key (str, optional): AI API key. If not provided, uses CHATAI_API_KEY from config.env.
+            accuracy_threshold (float, optional): Scores below this threshold are highlighted in the output.
+            embedding_model (str, optional): Embedding model used to shortlist reference questions.
+            candidate_count (int, optional): Number of nearest reference questions kept per unmatched question
+                before the AI matching step. Set to None (or 0) to send the full reference catalog.
+            embedding_cache_path (str, optional): SQLite file used to reuse question embeddings between runs.
+                Set to None to disable the embeddings cache.
+            response_cache_path (str, optional): SQLite file used to reuse deterministic (temperature 0) AI responses
+                between runs. Set to None to disable the responses cache.
+            reference_cache_dir (str, optional): Directory used to reuse the parsed reference questionnaire between runs.
+                Set to None to always parse the reference file.
+            use_batch_api (bool, optional): Submits the matching requests through the OpenAI Batch API instead of
+                calling the chat endpoint directly. Cheaper, but results can take up to the batch completion window.
+            reference_questionnaire (Reference_Questionnaire, optional): An already loaded reference questionnaire.
+                When given, the reference file arguments are ignored.
+            unanswered_questionnaire (Unanswered_Questionnaire, optional): An already loaded unanswered questionnaire.
+                When given, the unanswered file arguments are ignored.
             
         Environment Variables (config.env):
             CHATAI_BASE_URL: ChatAI Circle API base URL
@@ -55,35 +244,52 @@ class Questionnaire_Filler(object):
                        unanswered_file_name,
                        unanswered_question_col,
                        unanswered_answer_col,
-                       default_model="gpt-4o",
+                       default_model="gpt-4o-mini",
+                       matching_model=None,
+                       scoring_model=None,
+                       escalation_model="gpt-4o",
                        ai_url=None,
                        api_key=None,
-                       accuracy_threshold=0.85):
+                       accuracy_threshold=0.85,
+                       embedding_model="text-embedding-3-small",
+                       candidate_count=5,
+                       embedding_cache_path=DEFAULT_CACHE_PATH,
+                       response_cache_path=DEFAULT_RESPONSE_CACHE_PATH,
+                       reference_cache_dir=DEFAULT_REFERENCE_CACHE_DIR,
+                       use_batch_api=False,
+                       reference_questionnaire=None,
+                       unanswered_questionnaire=None):
         
-        # Load environment variables - try multiple paths
-        config_paths = ['config.env', '../config.env', './config.env']
-        for config_path in config_paths:
-            if os.path.exists(config_path):
-                load_dotenv(config_path)
-                break
+        # Load environment variables (only the first instance reads the config file)
+        _load_config()
         
         # Set AI credentials from environment or parameters
         self.ai_url = ai_url or os.getenv('CHATAI_BASE_URL')
         self.api_key = api_key or os.getenv('CHATAI_API_KEY')
-        self.default_model = default_model    
-        # Creates questionnaire objects
-        self.reference_questionnaire = Reference_Questionnaire(
-            file_path=reference_file_name,
-            question_col=reference_question_col,
-            answer_col=reference_answer_col
-        )
+        self.default_model = default_model
+        self.matching_model = matching_model or default_model
+        self.scoring_model = scoring_model or default_model
+        self.escalation_model = escalation_model
+
+        # Creates questionnaire objects unless they were passed in, reusing the parsed reference questionnaire when
+        # its file has not changed
+        if (reference_questionnaire is None):
+            reference_questionnaire = Reference_Questionnaire.from_cache(
+                file_path=reference_file_name,
+                question_col=reference_question_col,
+                answer_col=reference_answer_col,
+                cache_dir=reference_cache_dir
+            )
+        self.reference_questionnaire = reference_questionnaire
         
-        # Creates the unanswered questionnaire object
-        self.unanswered_questionnaire = Unanswered_Questionnaire(
-            file_path=unanswered_file_name,
-            question_col=unanswered_question_col,
-            answer_col=unanswered_answer_col
-        )
+        # Creates the unanswered questionnaire object unless it was passed in
+        if (unanswered_questionnaire is None):
+            unanswered_questionnaire = Unanswered_Questionnaire(
+                file_path=unanswered_file_name,
+                question_col=unanswered_question_col,
+                answer_col=unanswered_answer_col
+            )
+        self.unanswered_questionnaire = unanswered_questionnaire
 
         # Builds the AI client
         if self.ai_url and self.api_key:
@@ -94,8 +300,38 @@ class Questionnaire_Filler(object):
         # Set the accuracy threshold
         self.accuracy_threshold = accuracy_threshold
 
+        # Set the embedding prefilter settings
+        self.embedding_model = embedding_model
+        self.candidate_count = candidate_count if (candidate_count is not None and candidate_count > 0) else None
+        self.embedding_cache = Embedding_Cache(embedding_cache_path) if embedding_cache_path else None
+
+        # Set how the matching requests are sent
+        self.use_batch_api = use_batch_api
+        self.response_cache = Response_Cache(response_cache_path) if response_cache_path else None
+
         # Determines the static compliance match, hardcoded for requested questions by compliance team
         self.static_compliance_matches = {"What is the most sensitive data classification that the third party will have access to for this engagement?" : "Classification"}
+        self.static_compliance_matches_normalized = {self._normalize_question(question): match
+                                                     for question, match in self.static_compliance_matches.items()}
+
+
+
+    """Create a Questionnaire_Filler from questionnaires that are already loaded, without reading any file.
+        
+        Args:
+            reference_questionnaire (Reference_Questionnaire): The reference questionnaire.
+            unanswered_questionnaire (Unanswered_Questionnaire): The unanswered questionnaire.
+            **kwargs: The optional settings accepted by __init__ (models, AI credentials, caches and thresholds).
+
+        Returns:
+            Questionnaire_Filler: The questionnaire filler.
+    """
+    @classmethod
+    def from_questionnaires(cls, reference_questionnaire, unanswered_questionnaire, **kwargs):
+        return cls(None, None, None, None, None, None,
+                   reference_questionnaire=reference_questionnaire,
+                   unanswered_questionnaire=unanswered_questionnaire,
+                   **kwargs)
 
 
 
@@ -106,16 +342,17 @@ class Questionnaire_Filler(object):
     """
     def _build_ai_client(self, ai_url, api_key):
 
-        # Create a proper httpx client with increased timeout
-        http_client = httpx.Client(
-            timeout=60.0 
-        )
+        # Imports the OpenAI client and HTTP stack only when a client is built, as they are slow to import
+        from openai import OpenAI
+        from .http_client import get_http_client
 
-        # Configure the OpenAI client with the proxy URL
+        # Configure the OpenAI client with the proxy URL, sharing one pooled HTTP client across all requests
+        # and retrying transient failures instead of aborting the run
         client = OpenAI(
             base_url=ai_url,
             api_key=api_key,
-            http_client=http_client
+            http_client=get_http_client(),
+            max_retries=AI_MAX_RETRIES
         )
 
         # Returns the client
@@ -123,6 +360,54 @@ class Questionnaire_Filler(object):
     
 
 
+    """Builds the request body for a chat completion.
+        
+        Args:
+            user_prompt (str): The user prompt.
+            model (str): The model to use.
+            system_prompt (str): The system prompt.
+            temperature (float): The temperature.
+            max_tokens (int): The maximum number of tokens.
+            has_arr_content (bool): Whether the request has array content.
+            arr_content (dict): Message content for array content.
+            response_schema (dict, optional): A strict JSON schema for structured outputs. Uses JSON mode if not provided.
+
+        Returns:
+            dict: The keyword arguments for chat.completions.create.
+    """
+    def _build_ai_request(self, 
+                          user_prompt,
+                          model="gpt-4o",
+                          system_prompt="You are trapobot, a helpful assistant that fills out compliance questionnaires. ",
+                          temperature=0.7,
+                          max_tokens=500,
+                          has_arr_content=False,
+                          arr_content=dict(),
+                          response_schema=None):
+        
+        # Stores the message content
+        message_content = [{"role": "system", "content": system_prompt},
+                           {"role": "user", "content": user_prompt}]
+        
+        # If the request has content, add it to the message content
+        if (has_arr_content):
+            message_content.append({"role": "user", "content": json.dumps(arr_content, ensure_ascii=False, separators=_COMPACT_JSON_SEPARATORS)})
+
+        # Constrains the output to the schema when one is given, otherwise to any JSON object
+        if (response_schema is not None):
+            response_format = {"type": "json_schema", "json_schema": response_schema}
+        else:
+            response_format = {"type": "json_object"}
+
+        # Returns the request body
+        return {"model": model,
+                "messages": message_content,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "response_format": response_format}
+
+
+
     """Makes an AI request.
         
         Args:
@@ -133,6 +418,7 @@ class Questionnaire_Filler(object):
             max_tokens (int): The maximum number of tokens.
             has_arr_content (bool): Whether the request has array content.
             arr_content (dict): Message content for array content.
+            response_schema (dict, optional): A strict JSON schema for structured outputs. Uses JSON mode if not provided.
     """
     def _make_ai_request(self, 
                          user_prompt,
@@ -141,23 +427,13 @@ class Questionnaire_Filler(object):
                          temperature=0.7,
                          max_tokens=500,
                          has_arr_content=False,
-                         arr_content=dict()):
-        
-        # Stores the message content
-        message_content = [{"role": "system", "content": system_prompt},
-                           {"role": "user", "content": user_prompt}]
-        
-        # If the request has content, add it to the message content
-        if (has_arr_content):
-            message_content.append({"role": "user", "content": json.dumps(arr_content, ensure_ascii=False)})
+                         arr_content=dict(),
+                         response_schema=None):
         
         # Make a request
         response = self.ai_client.chat.completions.create(
-            model=model,
-            messages=message_content,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            response_format={"type": "json_object"}
+            **self._build_ai_request(user_prompt, model, system_prompt, temperature, max_tokens, has_arr_content, arr_content,
+                                     response_schema)
         )
 
         # Returns the response
@@ -165,6 +441,169 @@ class Questionnaire_Filler(object):
 
 
 
+    """Runs a list of AI requests, reusing cached responses and sending the rest.
+        
+        Args:
+            jobs (list): One dict of _make_ai_request keyword arguments per request.
+            
+        Returns:
+            list: The response content of each request (None for a failed batch request), in the same order as jobs.
+    """
+    def _run_ai_jobs(self, jobs):
+
+        # Sends every request when the responses cache is off
+        if (self.response_cache is None):
+            return self._send_ai_jobs(jobs)
+
+        # Looks up the deterministic requests (temperature 0) in the responses cache
+        requests = [self._build_ai_request(**job) for job in jobs]
+        cacheable = [position for position, request in enumerate(requests) if request["temperature"] == 0]
+        contents = [None] * len(jobs)
+        for position, content in zip(cacheable, self.response_cache.get_many([requests[position] for position in cacheable])):
+            contents[position] = content
+
+        # Sends only the requests that were not cached
+        missing = [position for position, content in enumerate(contents) if content is None]
+        if (missing):
+            for position, content in zip(missing, self._send_ai_jobs([jobs[position] for position in missing])):
+                contents[position] = content
+
+            # Stores the new deterministic responses, skipping invalid (e.g. truncated) JSON so it is retried next run
+            cacheable = set(cacheable)
+            new_positions = [position for position in missing if position in cacheable and self._is_valid_json(contents[position])]
+            if (new_positions):
+                self.response_cache.put_many([requests[position] for position in new_positions],
+                                             [contents[position] for position in new_positions])
+
+        # Returns the response contents
+        return contents
+
+
+
+    """Checks whether a response content is valid JSON.
+        
+        Args:
+            content (str): The response content.
+            
+        Returns:
+            bool: True if the content parses as JSON, False otherwise.
+    """
+    def _is_valid_json(self, content):
+        try:
+            json.loads(content)
+            return True
+        except (TypeError, ValueError):
+            return False
+
+
+
+    """Sends a list of AI requests, through the Batch API if it is enabled.
+        
+        Args:
+            jobs (list): One dict of _make_ai_request keyword arguments per request.
+            
+        Returns:
+            list: The response content of each request (None for a failed batch request), in the same order as jobs.
+    """
+    def _send_ai_jobs(self, jobs):
+
+        # Submits every request as one batch
+        if (self.use_batch_api and jobs):
+            return self._submit_batch(jobs)
+
+        # Otherwise calls the chat endpoint directly, sending several requests concurrently
+        if (len(jobs) <= 1):
+            return [self._make_ai_request(**job).choices[0].message.content for job in jobs]
+        return run_coroutine(self._run_ai_jobs_async(jobs))
+
+
+
+    """Sends several AI requests concurrently, with a bounded number in flight.
+        
+        Args:
+            jobs (list): One dict of _make_ai_request keyword arguments per request.
+            
+        Returns:
+            list: The response content of each request, in the same order as jobs.
+    """
+    async def _run_ai_jobs_async(self, jobs):
+
+        # Runs each blocking request in the default thread pool so the requests overlap
+        loop = asyncio.get_running_loop()
+        factories = [functools.partial(loop.run_in_executor, None, functools.partial(self._make_ai_request, **job))
+                     for job in jobs]
+
+        # Returns the response contents once every request has finished
+        responses = await gather_bounded(factories, MAX_CONCURRENT_AI_REQUESTS)
+        return [response.choices[0].message.content for response in responses]
+
+
+
+    """Submits a list of AI requests as one OpenAI batch and waits for the results.
+        
+        Args:
+            jobs (list): One dict of _make_ai_request keyword arguments per request.
+            
+        Returns:
+            list: The response content of each request (None for a failed request), in the same order as jobs.
+    """
+    def _submit_batch(self, jobs):
+
+        # Writes one chat completion request per JSONL line, tagged with its position
+        lines = [json.dumps({"custom_id": f"request-{position}",
+                             "method": "POST",
+                             "url": BATCH_ENDPOINT,
+                             "body": self._build_ai_request(**job)}, ensure_ascii=False)
+                 for position, job in enumerate(jobs)]
+
+        # Uploads the requests and starts the batch
+        batch_file = self.ai_client.files.create(file=("questionnaire_batch.jsonl", "\n".join(lines).encode("utf-8")),
+                                                 purpose="batch")
+        batch = self.ai_client.batches.create(input_file_id=batch_file.id,
+                                              endpoint=BATCH_ENDPOINT,
+                                              completion_window=BATCH_COMPLETION_WINDOW)
+        print(f"Submitted batch {batch.id} with {len(jobs)} requests")
+
+        # Polls until the batch has finished
+        while (batch.status not in BATCH_FINAL_STATUSES):
+            time.sleep(BATCH_POLL_INTERVAL)
+            batch = self.ai_client.batches.retrieve(batch.id)
+
+        # Raises an error if the batch did not produce any output
+        if (batch.status != "completed" or batch.output_file_id is None):
+            raise RuntimeError(f"ERROR: Batch {batch.id} finished with status '{batch.status}' and no output")
+
+        # Downloads the output and re-joins each response to its request by custom_id (output order is not guaranteed)
+        contents = [None] * len(jobs)
+        for line in self.ai_client.files.content(batch.output_file_id).text.splitlines():
+            if (not line.strip()):
+                continue
+            result = json.loads(line)
+            position = int(result["custom_id"].rsplit("-", 1)[1])
+            response = result.get("response") or {}
+            if (response.get("status_code") == 200):
+                contents[position] = response["body"]["choices"][0]["message"]["content"]
+            else:
+                print(f"Warning: batch request {result['custom_id']} failed: {result.get('error') or response.get('body')}")
+
+        # Returns the response contents
+        return contents
+
+
+
+    """Normalizes a question for exact matching, ignoring case, punctuation and spacing.
+        
+        Args:
+            question (str): The cleaned question text.
+            
+        Returns:
+            str: The normalized question text.
+    """
+    def _normalize_question(self, question):
+        return " ".join(_PUNCTUATION_PATTERN.sub(" ", question.casefold()).split())
+
+
+
     """Matches exact questions to the reference questionnaire and resets their reference question ID.
         
         Returns:
@@ -177,44 +616,118 @@ class Questionnaire_Filler(object):
         reference_questions = self.reference_questionnaire.get_questions()
         unanswered_questions = self.unanswered_questionnaire.get_questions()
 
-        # Creates sets of the dictionary keys to keep track of unmatched question pairs
-        unanswered_questions_remaining = set(unanswered_questions.keys())
-        reference_questions_remaining = set(reference_questions.keys())
+        # Returns early if there is nothing to match
+        if (len(unanswered_questions) == 0):
+            return ([], list(reference_questions))
+
+        # Binds the lookups used in the loops to locals once
+        unanswered_by_question = self.unanswered_questionnaire.questions
+        static_matches = self.static_compliance_matches_normalized
+        normalize_question = self._normalize_question
+        reference_index = None
+
+        # Keeps track of unmatched question pairs
+        unanswered_questions_remaining = []
+        matched_reference_questions = set()
 
-        # Matches the question
+        # Matches each question with a single normalized lookup, preferring the static compliance match, then a
+        # verbatim reference question (a plain dict lookup, so the normalized reference index is only built when needed)
         for question in unanswered_questions:
+            normalized_question = normalize_question(question)
+            matched_question = static_matches.get(normalized_question)
+            if (matched_question is None and question in reference_questions):
+                matched_question = question
+            elif (matched_question is None):
+
+                # Indexes the reference questions by normalized text only once a question needs it, so questions
+                # that differ only in case, punctuation or spacing still match exactly (the first reference question wins a tie)
+                if (reference_index is None):
+                    reference_index = {}
+                    for reference_question in reference_questions:
+                        reference_index.setdefault(normalize_question(reference_question), reference_question)
+                matched_question = reference_index.get(normalized_question)
+
+            # Keeps the question for the AI matching step if nothing matched
+            if (matched_question is None):
+                unanswered_questions_remaining.append(question)
+                continue
+
+            # Sets the reference question and the question match score
+            question_obj = unanswered_by_question[question]
+            question_obj.set_reference_question(matched_question)
+            question_obj.set_question_match_score(1)
+
+            # Removes the reference question from the remaining questions
+            matched_reference_questions.add(matched_question)
+
+        # Returns the remaining unmatched questions and reference questions
+        if (len(matched_reference_questions) == 0):
+            return (unanswered_questions_remaining, list(reference_questions))
+        reference_questions_remaining = [question for question in reference_questions if question not in matched_reference_questions]
+        return (unanswered_questions_remaining, reference_questions_remaining)
 
-            # If question is found in the existing questionnaire
-            if (question in reference_questions):
+    
 
-                # Gets the matching reference question
-                matched_question = reference_questions[question].get_question()
+    """Gets the embeddings for a subset of a questionnaire's questions.
 
-                # Gets the answer from the reference questionnaire
-                self.unanswered_questionnaire.questions[question].set_reference_question(matched_question)
+        Args:
+            questionnaire (Questionnaire): The questionnaire the questions belong to.
+            questions (list): The question texts to get embeddings for.
 
-                # Sets the question match score
-                self.unanswered_questionnaire.questions[question].set_question_match_score(1)
+        Returns:
+            np.ndarray: A (len(questions), d) array of embeddings, in the same order as questions.
+    """
+    def _get_question_embeddings(self, questionnaire, questions):
 
-                # Removes the question from the remaining questions
-                unanswered_questions_remaining.discard(question)
-                reference_questions_remaining.discard(matched_question)
+        # Embeds the whole questionnaire once (a single batched request) and looks up the requested rows, both of which
+        # the questionnaire keeps for the rest of the run
+        embeddings = questionnaire.get_embeddings(self.ai_client, self.embedding_model, self.embedding_cache)
+        positions = questionnaire.get_question_positions()
+        return embeddings[[positions[question] for question in questions]]
 
-            # If the question is in the static compliance match, set the reference question and question match score
-            if (question in self.static_compliance_matches):
 
-                # Sets the reference question and question match score
-                self.unanswered_questionnaire.questions[question].set_reference_question(self.static_compliance_matches[question])
-                self.unanswered_questionnaire.questions[question].set_question_match_score(1)
 
-                # Removes the question from the remaining questions
-                unanswered_questions_remaining.discard(question)
-                reference_questions_remaining.discard(self.static_compliance_matches[question])
+    """Shortlists the reference questions closest to each unmatched question using embedding similarity.
+        
+        Args:
+            unanswered_questions_remaining (list): The unmatched questions.
+            reference_questions_remaining (list): The remaining reference questions.
+            
+        Returns:
+            dict: Maps each unmatched question to its candidate_count nearest remaining reference questions, nearest first.
+    """
+    def _shortlist_reference_questions(self, unanswered_questions_remaining, reference_questions_remaining):
+
+        # Offers every unmatched question the full catalog if the prefilter is off or the catalog is already small
+        full_catalog = {question: reference_questions_remaining for question in unanswered_questions_remaining}
+        if (self.candidate_count is None or len(unanswered_questions_remaining) == 0
+                or len(reference_questions_remaining) <= self.candidate_count):
+            return full_catalog
+
+        # Gets the embeddings, falling back to the full catalog if the embeddings endpoint is unavailable
+        try:
+            unanswered_embeddings = self._get_question_embeddings(self.unanswered_questionnaire, unanswered_questions_remaining)
+            self.reference_questionnaire.get_embeddings(self.ai_client, self.embedding_model, self.embedding_cache)
+        except Exception as e:
+            print(f"Embedding prefilter unavailable, sending the full reference catalog: {e}")
+            return full_catalog
+
+        # Searches the whole reference questionnaire, over-fetching enough to skip questions that were already matched
+        reference_texts = self.reference_questionnaire.question_texts
+        remaining = set(reference_questions_remaining)
+        search_count = min(len(reference_texts), self.candidate_count + len(reference_texts) - len(remaining))
+        top_indices, _ = self.reference_questionnaire.get_nearest_questions(unanswered_embeddings, search_count)
+
+        # Keeps the nearest candidate_count remaining reference questions for every unmatched question
+        shortlisted = {}
+        for question, row in zip(unanswered_questions_remaining, top_indices):
+            candidates = [reference_texts[position] for position in row if reference_texts[position] in remaining]
+            shortlisted[question] = candidates[:self.candidate_count]
+
+        # Returns the shortlisted reference questions
+        return shortlisted
 
-        # Returns the reamining unmatched questions and reference questions
-        return (list(unanswered_questions_remaining), list(reference_questions_remaining))
 
-    
 
     """Matches questions to the reference questionnaire.
         
@@ -222,10 +735,80 @@ class Questionnaire_Filler(object):
             dict: Dictionary containing the AI-generated question matches.
     """
     def _match_questions_to_reference(self):
+        
+        # Stores the unmatched questions
+        unanswered_questions_remaining, reference_questions_remaining = self._match_exact_questions()
+
+        # Offers each unmatched question only the reference questions that are semantically close to it
+        candidates_by_question = self._shortlist_reference_questions(unanswered_questions_remaining, reference_questions_remaining)
+
+        # Matches the questions with the matching model
+        matches_array = self._request_question_matches(candidates_by_question, self.matching_model)
+
+        # Re-checks only the uncertain matches with the escalation model
+        return self._escalate_uncertain_matches(matches_array, candidates_by_question)
+
+
+
+    """Checks whether a question match is uncertain enough to re-check with the escalation model.
+        
+        Args:
+            match (dict): One entry of the AI-generated question matches.
+            
+        Returns:
+            bool: True if the match similarity falls in ESCALATION_SIMILARITY_RANGE, False otherwise.
+    """
+    def _is_uncertain_match(self, match):
+        details = match.get("match")
+        if (not isinstance(details, dict) or not isinstance(details.get("similarity"), (int, float))):
+            return False
+        return ESCALATION_SIMILARITY_RANGE[0] <= details["similarity"] < ESCALATION_SIMILARITY_RANGE[1]
+
+
+
+    """Re-asks the escalation model for the uncertain question matches only.
+        
+        Args:
+            matches_array (list): The AI-generated question matches.
+            candidates_by_question (dict): The candidate reference questions of each unmatched question.
+            
+        Returns:
+            list: The question matches, with the uncertain ones replaced by the escalation model's answers.
+    """
+    def _escalate_uncertain_matches(self, matches_array, candidates_by_question):
+
+        # Skips the cascade when it is disabled or would ask the same model again
+        if (self.escalation_model is None or self.escalation_model == self.matching_model):
+            return matches_array
+
+        # Collects the uncertain matches
+        uncertain_candidates = {match["unmatched_question"]: candidates_by_question[match["unmatched_question"]]
+                                for match in matches_array if self._is_uncertain_match(match)}
+        if (len(uncertain_candidates) == 0):
+            return matches_array
+
+        # Re-matches only those questions and replaces their entries
+        print(f"Re-checking {len(uncertain_candidates)} uncertain question matches with {self.escalation_model}")
+        escalated_matches = {match["unmatched_question"]: match
+                             for match in self._request_question_matches(uncertain_candidates, self.escalation_model)}
+        return [escalated_matches.get(match.get("unmatched_question"), match) for match in matches_array]
+
+
+
+    """Asks the AI model to match each unmatched question to one of its candidate reference questions.
+        
+        Args:
+            candidates_by_question (dict): Maps each unmatched question to the reference questions to choose from.
+            model (str): The model to use.
+            
+        Returns:
+            list: The AI-generated question matches.
+    """
+    def _request_question_matches(self, candidates_by_question, model):
 
         # Static variables for the questionnaire matching task
         QUESTIONNAIRE_MATCHING_TEMPERATURE = 0
-        QUESTIONNAIRE_MATCHING_MODEL = self.default_model
+        QUESTIONNAIRE_MATCHING_MODEL = model
 
         # Stores the system prompt for the questionnaire matching task
         QUESTIONNAIRE_MATCHING_PROMPT = ("You are QuestionnaireMatcher. Given a new question + answered candidates, return MATCH if exactly same intent, "
@@ -241,82 +824,90 @@ class Questionnaire_Filler(object):
                                               "\"Dog?\"↔\"Pets?\", \"Currently insured?\"↔\"Ever had insurance?\", \"Registered in CA?\"↔\"Registered?\"." )
 
         # Stores the instructions for the questionnaire matching task
-        USER_PROMPT = """You will receive:
-                        1) A list of UNMATCHED questions for the unanswered questionnaire.
-                        2) A list of REFERENCE_CATALOG of questions for the reference questionnaire.
+        USER_PROMPT = """You will receive a JSON object with:
+                        1) "new_question": An UNMATCHED question from the unanswered questionnaire.
+                        2) "candidates": A list of candidate questions from the reference questionnaire.
 
                         TASK:
-                        For each UNMATCHED question, select the best-matching question from REFERENCE_CATALOG.
+                        Select the candidate that best matches the UNMATCHED question.
 
                         Rules:
                         - CRITICAL: Return ONLY valid JSON with this exact structure. Ensure all strings are properly escaped:
                         {
-                            "matches": [
-                                {
-                                    "unmatched_question": "string",
-                                    "match": {
-                                        "matched_question": "string",
-                                        "similarity": 0.85,
-                                        "justification": "string"
-                                    },
-                                    "no_match": false
-                                }
-                            ]
+                            "match": {
+                                "matched_question": "string",
+                                "similarity": 0.85
+                            },
+                            "no_match": false
                         }
 
                         Constraints:
-                        - Keep justification one sentence, no hedging.
-                        - If no adequate match exists, set no_match=true and match=None.
+                        - matched_question must be copied exactly from candidates.
+                        - If no adequate match exists, set no_match=true and match=null.
                         - Be deterministic.
                         - similarity should be 0.00 to 1.00
-                        - Must return valid JSON object with "matches" array
 
                         Evaluation hints: Decompose into subject/attribute/scope; require explicit subject match; reject hypernym/hyponym jumps; align timeframe/jurisdiction/thresholds/units; enforce same polarity; don't match general↔specific; require full alignment for multi-part questions; normalize acronyms only if supported by hints; distinguish policy vs. practice and state vs. proof; treat data types distinctly (PII/PHI/telemetry). Hard NOs: opposite polarity, numeric or timeframe conflict, jurisdiction mismatch, storage vs. transport, collect vs. retain vs. delete, DPIA vs. control. Confidence starts at semantic similarity minus penalties; MATCH only if ≥49. For ties, prefer exact scope and threshold matches, then fewer assumptions."""
-        
-        # Stores the unmatched questions
-        unanswered_questions_remaining, reference_questions_remaining = self._match_exact_questions()
 
-        # Stores the question payload for the AI request
-        question_payload = {
-            "unanswered_questions": unanswered_questions_remaining,
-            "reference_questions": reference_questions_remaining
-        }
 
-        # Makes an AI request with the unmatched questions and reference questions
-        response = self._make_ai_request(
+        # Records no match without a request for questions that have no candidates left
+        questions = [question for question, candidates in candidates_by_question.items() if (len(candidates) > 0)]
+        matches_array = [{"unmatched_question": question, "match": None, "no_match": True}
+                         for question, candidates in candidates_by_question.items() if (len(candidates) == 0)]
+
+        # Makes one small AI request per unmatched question with its candidates, sent concurrently
+        resp_contents = self._run_ai_jobs([dict(
             user_prompt=USER_PROMPT,
             model=QUESTIONNAIRE_MATCHING_MODEL,
             system_prompt=QUESTIONNAIRE_MATCHING_PROMPT,
             temperature=QUESTIONNAIRE_MATCHING_TEMPERATURE,
-            max_tokens=2000,
+            max_tokens=QUESTION_MATCHING_MAX_TOKENS,
             has_arr_content=True,
-            arr_content=question_payload
-        )
+            arr_content={"new_question": question, "candidates": candidates_by_question[question]},
+            response_schema=QUESTION_MATCH_SCHEMA
+        ) for question in questions])
+
+        # Parses every response (a failed response only loses its own question)
+        for question, resp_content in zip(questions, resp_contents):
+            match = self._parse_question_match(question, resp_content)
+            if (match is not None):
+                matches_array.append(match)
+        print(f"Successfully parsed {len(matches_array)} question matches")
+
+        # Returns the question matches
+        return matches_array
+
 
 
-        # Gets the response content
-        resp_content = response.choices[0].message.content
+    """Parses one question matching response.
+        
+        Args:
+            question (str): The unmatched question the response is for.
+            resp_content (str): The JSON response content.
+            
+        Returns:
+            dict: The question match, or None if the response could not be parsed.
+    """
+    def _parse_question_match(self, question, resp_content):
         
         # Parse response content using OpenAI's native JSON parsing
         try:
-            # Parse the JSON response directly (OpenAI's JSON mode ensures valid JSON)
+            # Parse the JSON response directly (the strict response schema guarantees its shape)
             response_data = json.loads(resp_content)
-            # Extract the matches array from the structured response
-            matches_array = response_data.get("matches", [])
-            print(f"Successfully parsed {len(matches_array)} question matches")
-
-            return matches_array
+            return {"unmatched_question": question,
+                    "match": response_data.get("match"),
+                    "no_match": response_data.get("no_match", response_data.get("match") is None)}
         
-        # Errors if the JSON returned by the AI cleint is not valid
+        # Errors if the response was cut off at the token limit or the endpoint ignored the schema
         except json.JSONDecodeError as e:
-            print(f"Error parsing JSON response from AI model: {e}")
+            print(f"Error parsing JSON response from AI model for question {question!r}: {e}")
             print(f"Raw response content: {resp_content[:200]}...")
-            return []
+            return None
         except Exception as e:
             print(f"Unexpected error during response processing: {e}")
             print(f"Error type: {type(e).__name__}")
             print(f"Error message: {e}")
-            return []
+            return None
     
 
 
@@ -329,25 +920,25 @@ class Questionnaire_Filler(object):
             bool: True if text contains alphanumeric characters, False otherwise.
     """
     def _has_meaningful_content(self, text):
+
+        # Checks strings, the common case, through the cache
+        if (isinstance(text, str)):
+            return _string_has_meaningful_content(text)
+
+        # None and NaN (the only value not equal to itself) have no content
         if (text is None):
             return False
-        
-        # Check for NaN values (pandas NaN becomes nan when converted to string)
+
+        # Numbers and booleans always print a digit or letter unless they are NaN
+        if (isinstance(text, (int, float, np.number))):
+            return bool(text == text)
+
+        # Check for other missing values, such as pd.NA and NaT
         if (pd.isna(text)):
             return False
-        
-        # Convert everything to string first
-        text_str = str(text)
-        
-        # Additional check for string representations of NaN/null values
-        if (text_str.lower() in ['nan', 'none', 'null', '']):
-            return False
-        
-        # Strip whitespace and check if there are any alphanumeric characters
-        stripped = text_str.strip()
 
-        # Returns True if the text contains alphanumeric characters, False otherwise
-        return len(stripped) > 0 and any(c.isalnum() for c in stripped)
+        # Checks the string form of anything else
+        return _string_has_meaningful_content(str(text))
 
 
     """ Gets the items for the answer matching task.
@@ -357,35 +948,52 @@ class Questionnaire_Filler(object):
     """
     def _get_items_for_answer_matching(self):
 
-        # Gets the questions from the reference questionnaire and the unanswered questionnaire
-        items_json = []
-
-        # Goes through the unanswered questionnaire
-        for question in self.unanswered_questionnaire.get_questions():
-
-            # Gets the current answer
-            current_answer = self.unanswered_questionnaire.questions[question].get_answer()
-
-            # Gets the reference question
-            reference_question = self.unanswered_questionnaire.questions[question].get_reference_question()
-
-            # Only process if both reference question and current answer have meaningful content
-            if (reference_question != None and reference_question != "" and self._has_meaningful_content(current_answer)):
-
-                # Gets the reference answer
-                reference_answer = self.reference_questionnaire.questions[reference_question].get_answer()
-
-                # If the answers are a match, set the answer match score to 1
-                if (str(current_answer).strip() == str(reference_answer).strip()):
-                    self.unanswered_questionnaire.questions[question].set_answer_match_score(1)
+        # Gets the questions from the unanswered questionnaire, returning early if there are none
+        unanswered_questions = self.unanswered_questionnaire.get_questions()
+        if (len(unanswered_questions) == 0):
+            return []
 
-                # Otherwise, add the item to the items_json list
-                else:
-                    items_json.append({
-                        "q": question,
-                        "a1": current_answer,
-                        "a2": reference_answer
-                    })
+        # Gets the answers of the reference questionnaire once
+        question_objs = list(unanswered_questions.values())
+        reference_answers = {question: question_obj.get_answer()
+                             for question, question_obj in self.reference_questionnaire.questions.items()}
+
+        # Lays out the current answers and reference questions column-wise
+        items_frame = pd.DataFrame({
+            "q": list(unanswered_questions.keys()),
+            "a1": [question_obj.get_answer() for question_obj in question_objs],
+            "reference_question": [question_obj.get_reference_question() for question_obj in question_objs]
+        }, dtype=object)
+        items_frame["a2"] = items_frame["reference_question"].map(reference_answers)
+
+        # Only process if both reference question and current answer have meaningful content
+        # (the same rules as _has_meaningful_content, applied to the whole column at once)
+        current_answers = items_frame["a1"].astype(str)
+        has_content = (items_frame["a1"].notna()
+                       & ~current_answers.str.lower().isin(_NULL_STRINGS)
+                       & current_answers.str.contains(_ALPHANUMERIC_PATTERN))
+        has_reference = items_frame["reference_question"].isin(reference_answers.keys())
+        to_compare = (has_content & has_reference).to_numpy(dtype=bool)
+
+        # If the answers are a match, set the answer match score to 1
+        is_identical = to_compare & (current_answers.str.strip() == items_frame["a2"].astype(str).str.strip()).to_numpy(dtype=bool)
+        for question_obj in np.asarray(question_objs, dtype=object)[is_identical]:
+            question_obj.set_answer_match_score(1)
+
+        # Scores the clearly same or clearly different pairs locally when the reference answer has content too
+        reference_answers_str = items_frame["a2"].astype(str)
+        reference_has_content = (items_frame["a2"].notna()
+                                 & ~reference_answers_str.str.lower().isin(_NULL_STRINGS)
+                                 & reference_answers_str.str.contains(_ALPHANUMERIC_PATTERN)).to_numpy(dtype=bool)
+        needs_ai = to_compare & ~is_identical
+        for position in np.flatnonzero(needs_ai & reference_has_content):
+            local_score = local_answer_score(current_answers.iat[position], reference_answers_str.iat[position])
+            if (local_score is not None):
+                question_objs[position].set_answer_match_score(local_score)
+                needs_ai[position] = False
+
+        # Otherwise, add the item to the items_json list
+        items_json = items_frame.loc[needs_ai, ["q", "a1", "a2"]].to_dict("records")
 
         # Returns the items_json list
         return items_json
@@ -411,7 +1019,7 @@ class Questionnaire_Filler(object):
 
         # Static variables for the answer matching task
         ANSWER_MATCHING_TEMPERATURE = 0
-        ANSWER_MATCHING_MODEL = self.default_model
+        ANSWER_MATCHING_MODEL = self.scoring_model
 
         # Stores the system prompt for the answer matching task
         ANSWER_MATCHING_PROMPT = ("You are AnswerMatcher. Given two answers to a question, you will return the answer match score. "
@@ -444,31 +1052,54 @@ class Questionnaire_Filler(object):
                         Score each question-answer pair based on semantic similarity of a1 vs a2 given the question context.
                         """
         
-        # Prepare the items payload for the AI request
-        items_payload = {
-            "questions": items_json
-        }
-        
-        # Makes an AI request with the items for answer matching
-        response = self._make_ai_request(
+        # Strips and caps the answers so a few long free-text answers do not dominate the prompt
+        items_json = [{"q": item["q"],
+                       "a1": str(item["a1"]).strip()[:MAX_SCORED_ANSWER_LENGTH],
+                       "a2": str(item["a2"]).strip()[:MAX_SCORED_ANSWER_LENGTH]}
+                      for item in items_json]
+
+        # Splits the items into small chunks so every response stays well under its token limit
+        item_chunks = [items_json[start:start + ANSWER_MATCHING_CHUNK_SIZE]
+                       for start in range(0, len(items_json), ANSWER_MATCHING_CHUNK_SIZE)]
+
+        # Makes one AI request per chunk, sent concurrently, and gets the response contents
+        resp_contents = self._run_ai_jobs([dict(
             user_prompt=USER_PROMPT,
             model=ANSWER_MATCHING_MODEL,
             system_prompt=ANSWER_MATCHING_PROMPT,
             temperature=ANSWER_MATCHING_TEMPERATURE,
-            max_tokens=16000,
+            max_tokens=2000,
             has_arr_content=True,
-            arr_content=items_payload
-        )
+            arr_content={"questions": item_chunk},
+            response_schema=ANSWER_SCORES_SCHEMA
+        ) for item_chunk in item_chunks])
+
+        # Merges the scores from every chunk (a failed chunk only loses its own items)
+        answer_scores = {}
+        for resp_content in resp_contents:
+            answer_scores.update(self._parse_answer_scores(resp_content))
+        print(f"Successfully parsed answer match scores for {len(answer_scores)} items")
 
-        # Gets the response content and parse it
-        resp_content = response.choices[0].message.content
+        # Returns the answer scores
+        return answer_scores
+
+
+
+    """Parses one answer matching response and sets the answer match scores it contains.
+        
+        Args:
+            resp_content (str): The JSON response content.
+            
+        Returns:
+            answer_scores (dict): Dictionary mapping questions to their answer match scores.
+    """
+    def _parse_answer_scores(self, resp_content):
         
         # Parse response content using OpenAI's native JSON parsing -- This is not decomposed given the nature of the task
         try:
-            # Parse the JSON response directly (OpenAI's JSON mode ensures valid JSON)
+            # Parse the JSON response directly (the strict response schema guarantees its shape)
             answer_scores_response = json.loads(resp_content)
             results = answer_scores_response.get('results', [])
-            print(f"Successfully parsed answer match scores for {len(results)} items")
             
             # Extract scores and update the unanswered questionnaire
             answer_scores = {}
@@ -484,7 +1115,7 @@ class Questionnaire_Filler(object):
             # Returns the answer scores
             return answer_scores
         
-        # Enhanced fallback parsing for malformed JSON
+        # Errors if the response was cut off at the token limit or the endpoint ignored the schema
         except json.JSONDecodeError as e:
             print(f"Error parsing JSON response from AI model for answer matching: {e}")
             print(f"Full response content length: {len(resp_content)}")
@@ -509,26 +1140,23 @@ class Questionnaire_Filler(object):
         # Gets the best matches from the reference questionnaire
         best_matches = self._match_questions_to_reference()
 
+        # Binds the unanswered questions to a local once
+        unanswered_by_question = self.unanswered_questionnaire.questions
+
         # Fills the best matches
         for match in best_matches:
 
             # Stores the unmatched question
-            unmatched_question = match["unmatched_question"]
-
-            # Stores the best match
-            if (match["match"] != None):
-                best_match = match["match"]["matched_question"]
-            else:
-                best_match = None
+            question_obj = unanswered_by_question[match["unmatched_question"]]
 
-            # Sets the question match score
+            # Sets the question match score and the reference question to be the best matching question
+            # from the reference questionnaire
             if (match["match"] != None):
-                self.unanswered_questionnaire.questions[unmatched_question].set_question_match_score(match["match"]["similarity"])
+                question_obj.set_question_match_score(match["match"]["similarity"])
+                question_obj.set_reference_question(match["match"]["matched_question"])
             else:
-                self.unanswered_questionnaire.questions[unmatched_question].set_question_match_score(0)
-
-            # Sets the reference question to be the best matching question from the reference questionnaire
-            self.unanswered_questionnaire.questions[unmatched_question].set_reference_question(best_match)
+                question_obj.set_question_match_score(0)
+                question_obj.set_reference_question(None)
 
         # Fill the answer match scores for all questions that have reference matches
         self._fill_answer_matches_score()
@@ -550,104 +1178,212 @@ class Questionnaire_Filler(object):
     """
     def generate_combined_questionnaire(self, output_file_name="combined_questionnaire.xlsx"):
 
-        # Creates a list to store the rows for the combined questionnaire
-        combined_questionnaire_rows = []
+        # Creates one list per column of the combined questionnaire
+        current_questions = []
+        matched_questions = []
+        matched_question_rows = []
+        question_match_scores = []
+        current_answers = []
+        matched_answers = []
+        answer_match_scores = []
 
         # Gets the questions from the unanswered questionnaire
         unanswered_questions = self.unanswered_questionnaire.get_questions()
 
+        # Looks up the reference answers and rows once instead of once per unanswered question
+        reference_by_question = self.reference_questionnaire.questions
+        reference_answers = {question: question_obj.get_answer() for question, question_obj in reference_by_question.items()}
+        reference_rows = {question: question_obj.get_question_id() + 1 for question, question_obj in reference_by_question.items()}
+
         # Iterates through the unanswered questionnaire
-        for question in unanswered_questions:
+        for question_obj in unanswered_questions.values():
 
             # Gets the current question and answer
-            current_question = unanswered_questions[question].get_question()
-            current_answer = unanswered_questions[question].get_answer()
-
-            # Gets the last question and answer
-            last_question = unanswered_questions[question].get_reference_question()
-            
-            # Handle case where no match was found (last_question is None)
-            if (last_question != None and last_question in self.reference_questionnaire.questions):
-                question_id = self.reference_questionnaire.questions[last_question].get_question_id() + 1
-                last_answer = self.reference_questionnaire.questions[last_question].get_answer()
-            else:
-                question_id = -1  # No match found, use -1 for error
-                last_answer = ""
-
-            # Gets the question match score
-            question_match_score = unanswered_questions[question].get_question_match_score()
-
-            # Gets the answer match score
-            answer_match_score = unanswered_questions[question].get_answer_match_score()
-
-            # Adds the question and answer data to the rows list
-            combined_questionnaire_rows.append({
-                "Current Question": current_question, 
-                "Matched Question": last_question, 
-                "Matched Question Row": question_id,
-                "Question Match Score": question_match_score,
-                "Current Answer": current_answer, 
-                "Matched Answer": last_answer, 
-                "Answer Match Score": answer_match_score
-            })
-            
-        # Creates the combined questionnaire DataFrame from the collected rows
-        combined_questionnaire = pd.DataFrame(combined_questionnaire_rows)
+            current_questions.append(question_obj.get_question())
+            current_answers.append(question_obj.get_answer())
+
+            # Gets the last question and answer, using -1 for the row when no match was found
+            last_question = question_obj.get_reference_question()
+            matched_questions.append(last_question)
+            matched_question_rows.append(reference_rows.get(last_question, -1))
+            matched_answers.append(reference_answers.get(last_question, ""))
+
+            # Gets the question and answer match scores
+            question_match_scores.append(question_obj.get_question_match_score())
+            answer_match_scores.append(question_obj.get_answer_match_score())
+
+        # Creates the combined questionnaire DataFrame from the collected columns, with the numeric dtypes given up front
+        # (a score that is not a number becomes NaN instead of failing the write) and the matched reference columns (which repeat whenever several questions match the same one) as categoricals
+        combined_questionnaire = pd.DataFrame({
+            "Current Question": current_questions,
+            "Matched Question": pd.Categorical(matched_questions),
+            "Matched Question Row": np.asarray(matched_question_rows, dtype=np.int32),
+            "Question Match Score": pd.to_numeric(question_match_scores, errors="coerce").astype(np.float64),
+            "Current Answer": current_answers,
+            "Matched Answer": pd.Categorical(matched_answers),
+            "Answer Match Score": pd.to_numeric(answer_match_scores, errors="coerce").astype(np.float64)
+        })
         
         # Check if output should be Excel format (for styling) or CSV
         if output_file_name.lower().endswith('.xlsx'):
             # Save to Excel with conditional formatting
-            with pd.ExcelWriter(output_file_name, engine='openpyxl') as writer:
-                combined_questionnaire.to_excel(writer, sheet_name='Combined Questionnaire', index=False)
-                
-                # Get the workbook and worksheet objects
-                workbook = writer.book
-                worksheet = writer.sheets['Combined Questionnaire']
-                
-                # Define pink fill for cells with scores < self.accuracy_threshold
-                pink_fill = PatternFill(start_color='FFC0CB', end_color='FFC0CB', fill_type='solid')
-                
-                # Define text wrapping alignment
-                wrap_alignment = Alignment(wrap_text=True, vertical='top')
-                
-                # Set column widths and formatting
-                # Column mapping: A=Current Question, B=Matched Question, C=Matched Question Row, 
-                # D=Question Match Score, E=Current Answer, F=Matched Answer, G=Answer Match Score
-                text_columns = ['A', 'B', 'E', 'F']  # Text columns that need wider width and wrapping
-                number_columns = ['C', 'D', 'G']     # Number columns (question ID and scores)
-                
-                # Set width and wrapping for text columns
-                for col in text_columns:
-                    worksheet.column_dimensions[col].width = 30
-                    # Apply text wrapping to all cells in text columns
-                    for row_idx in range(1, len(combined_questionnaire) + 2):  # Include header row
-                        cell = worksheet.cell(row=row_idx, column=ord(col) - ord('A') + 1)
-                        cell.alignment = wrap_alignment
-                
-                # Set appropriate width for number columns and apply wrapping
-                for col in number_columns:
-                    worksheet.column_dimensions[col].width = 12
-                    # Apply text wrapping to all cells in number columns
-                    for row_idx in range(1, len(combined_questionnaire) + 2):  # Include header row
-                        cell = worksheet.cell(row=row_idx, column=ord(col) - ord('A') + 1)
-                        cell.alignment = wrap_alignment
-                
-                # Apply conditional formatting to Question Match Score column (column D, index 4)
-                question_score_col = 4  # 1-indexed (D column)
-                for row_idx in range(2, len(combined_questionnaire) + 2):  # Start from row 2 (after header)
-                    cell = worksheet.cell(row=row_idx, column=question_score_col)
-                    if cell.value is not None and isinstance(cell.value, (int, float)) and cell.value < self.accuracy_threshold:
-                        cell.fill = pink_fill
-                
-                # Apply conditional formatting to Answer Match Score column (column G, index 7)
-                answer_score_col = 7  # 1-indexed (G column)
-                for row_idx in range(2, len(combined_questionnaire) + 2):  # Start from row 2 (after header)
-                    cell = worksheet.cell(row=row_idx, column=answer_score_col)
-                    if cell.value is not None and isinstance(cell.value, (int, float)) and cell.value < self.accuracy_threshold:
-                        cell.fill = pink_fill
+            if (xlsxwriter is not None):
+                self._write_excel_xlsxwriter(combined_questionnaire, output_file_name)
+            else:
+                self._write_excel_openpyxl(combined_questionnaire, output_file_name)
         else:
-            # Save as CSV (no styling possible)
-            combined_questionnaire.to_csv(output_file_name, index=False)
+            # Save as CSV (no styling possible) through a large write buffer to cut the number of write calls
+            with open(output_file_name, 'w', encoding='utf-8', newline='', buffering=CSV_WRITE_BUFFER_SIZE) as csv_file:
+                combined_questionnaire.to_csv(csv_file, index=False)
             
         # Alerts the user that the combined questionnaire has been saved
-        print(f"Combined questionnaire has been saved to {output_file_name}!")
\ No newline at end of file
+        print(f"Combined questionnaire has been saved to {output_file_name}!")
+
+
+
+    """Finds the score columns holding at least one score below the accuracy threshold.
+
+        Args:
+            combined_questionnaire (pd.DataFrame): The combined questionnaire.
+
+        Returns:
+            list: The names of the score columns that need a low score highlight.
+    """
+    def _low_score_columns(self, combined_questionnaire):
+
+        # Skips the highlight rule for columns whose lowest score already meets the threshold (NaN scores are never flagged)
+        return [column_name for column_name in SCORE_COLUMNS
+                if (combined_questionnaire[column_name].min() < self.accuracy_threshold)]
+
+
+
+    """Saves the combined questionnaire to Excel with xlsxwriter, highlighting scores below the accuracy threshold.
+        
+        Args:
+            combined_questionnaire (pd.DataFrame): The combined questionnaire.
+            output_file_name (str): The .xlsx file to write.
+    """
+    def _write_excel_xlsxwriter(self, combined_questionnaire, output_file_name):
+
+        # Writes straight to an in-memory workbook, skipping pandas' per-cell formatting pass, then styles whole columns
+        # and ranges instead of individual cells
+        buffer = io.BytesIO()
+        workbook = xlsxwriter.Workbook(buffer, {"in_memory": True})
+        try:
+            worksheet = workbook.add_worksheet(COMBINED_SHEET_NAME)
+
+            # Defines one shared format for the header (bold and bordered like pandas writes it), wrapping and low scores
+            header_format = workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top", "text_wrap": True})
+            wrap_format = workbook.add_format({"text_wrap": True, "valign": "top"})
+            pink_format = workbook.add_format({"bg_color": f"#{LOW_SCORE_COLOR}", "pattern": 1})
+
+            # Writes the header row, then each column with a single call, leaving missing values blank
+            worksheet.write_row(0, 0, list(combined_questionnaire.columns), header_format)
+            for column, column_name in enumerate(combined_questionnaire.columns):
+                values = combined_questionnaire[column_name]
+                worksheet.write_column(1, column, values.astype(object).where(values.notna(), None).tolist())
+
+            # Sets the width and wrapping of every column from the sheet layout table
+            for column, column_name in enumerate(combined_questionnaire.columns):
+                worksheet.set_column(column, column, COMBINED_COLUMN_WIDTHS.get(column_name, TEXT_COLUMN_WIDTH), wrap_format)
+
+            # Highlights numeric scores below the threshold in the Question and Answer Match Score columns
+            last_row = len(combined_questionnaire)
+            if (last_row > 0):
+                for column_name in self._low_score_columns(combined_questionnaire):
+                    column = combined_questionnaire.columns.get_loc(column_name)
+                    letter = xl_col_to_name(column)
+                    worksheet.conditional_format(1, column, last_row, column, {
+                        "type": "formula",
+                        "criteria": f"=AND(ISNUMBER({letter}2),{letter}2<{self.accuracy_threshold})",
+                        "format": pink_format
+                    })
+        finally:
+            workbook.close()
+
+        # Writes the finished file with a single write call
+        self._write_buffer(buffer, output_file_name)
+
+
+
+    """Saves the combined questionnaire to Excel with openpyxl, highlighting scores below the accuracy threshold.
+        
+        Args:
+            combined_questionnaire (pd.DataFrame): The combined questionnaire.
+            output_file_name (str): The .xlsx file to write.
+    """
+    def _write_excel_openpyxl(self, combined_questionnaire, output_file_name):
+
+        # Imports openpyxl only on this fallback path
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.formatting.rule import FormulaRule
+        from openpyxl.styles import PatternFill, Alignment, Border, Font, Side
+        from openpyxl.utils import get_column_letter
+
+        # Define pink fill for cells with scores < self.accuracy_threshold, once and in opaque ARGB (conditional
+        # formatting reads the background of a differential style from end_color)
+        pink_fill = PatternFill(start_color=LOW_SCORE_ARGB, end_color=LOW_SCORE_ARGB, fill_type='solid')
+
+        # Define text wrapping alignment, shared by every cell (openpyxl styles are immutable)
+        wrap_alignment = Alignment(wrap_text=True, vertical='top')
+
+        # Streams the rows straight to the file in write-only mode instead of building the whole sheet in memory
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet(COMBINED_SHEET_NAME)
+
+        # Set width for text and number columns from the sheet layout table (before any row is written)
+        for column, column_name in enumerate(combined_questionnaire.columns, start=1):
+            worksheet.column_dimensions[get_column_letter(column)].width = COMBINED_COLUMN_WIDTHS.get(column_name, TEXT_COLUMN_WIDTH)
+
+        # Apply conditional formatting to the Question and Answer Match Score columns as one rule per column
+        # (the same rules the xlsxwriter path writes) instead of a fill per cell
+        last_row = len(combined_questionnaire) + 1
+        if (last_row > 1):
+            for column_name in self._low_score_columns(combined_questionnaire):
+                letter = get_column_letter(combined_questionnaire.columns.get_loc(column_name) + 1)
+                worksheet.conditional_formatting.add(f"{letter}2:{letter}{last_row}", FormulaRule(
+                    formula=[f"AND(ISNUMBER({letter}2),{letter}2<{self.accuracy_threshold})"],
+                    fill=pink_fill
+                ))
+
+        # Writes the header bold, bordered and centered like pandas does
+        thin_side = Side(style='thin')
+        header_font = Font(bold=True)
+        header_border = Border(left=thin_side, right=thin_side, top=thin_side, bottom=thin_side)
+        header_alignment = Alignment(horizontal='center', vertical='top', wrap_text=True)
+        header_cells = []
+        for column_name in combined_questionnaire.columns:
+            cell = WriteOnlyCell(worksheet, value=column_name)
+            cell.font = header_font
+            cell.border = header_border
+            cell.alignment = header_alignment
+            header_cells.append(cell)
+        worksheet.append(header_cells)
+
+        # Writes every row with text wrapping, leaving missing values blank
+        data = combined_questionnaire.astype(object).where(combined_questionnaire.notna(), None)
+        for values in data.itertuples(index=False, name=None):
+            row_cells = []
+            for value in values:
+                cell = WriteOnlyCell(worksheet, value=value)
+                cell.alignment = wrap_alignment
+                row_cells.append(cell)
+            worksheet.append(row_cells)
+
+        # Saves the workbook in memory, then writes the finished file with a single write call
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        self._write_buffer(buffer, output_file_name)
+
+
+
+    """Writes a serialized workbook to disk in one call.
+        
+        Args:
+            buffer (io.BytesIO): The serialized workbook.
+            output_file_name (str): The file to write.
+    """
+    def _write_buffer(self, buffer, output_file_name):
+        with open(output_file_name, 'wb') as output_file:
+            output_file.write(buffer.getbuffer())
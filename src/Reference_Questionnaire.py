@@ -1,11 +1,47 @@
-# Last Updated: 2025-08-22
+# Last Updated: 2026-10-14
 # Description: A class for reading an answered questionnaire for Compliance team.
 #              (1) Inherits from the Questionnaire class.
+#              (2) Finds the nearest reference questions for query embeddings, using an HNSW index when available.
+#              (3) Caches the parsed questionnaire on disk, keyed by a hash of the file and the column names.
 
 ################################################################################
 # Imports
 ################################################################################
 from .Questionnaire import Questionnaire
+from .Embedding_Cache import DEFAULT_CACHE_PATH
+from .similarity import cosine_topk, normalize_rows
+import numpy as np
+import hashlib
+import os
+import pickle
+
+# Optional: hnswlib's approximate nearest-neighbour index, brute-force cosine is used when it is not installed
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+################################################################################
+# Constants
+################################################################################
+
+# Below this many reference questions a brute-force matrix product is faster than an index
+ANN_MIN_QUESTIONS = 1000
+
+# HNSW build and search parameters
+ANN_M = 16
+ANN_EF_CONSTRUCTION = 200
+ANN_EF_SEARCH = 50
+
+# Default directory for parsed reference questionnaires (shared with the embeddings cache). The cache files are
+# pickles, and unpickling runs code, so the directory must only be writable by the user running the filler
+DEFAULT_REFERENCE_CACHE_DIR = os.path.dirname(DEFAULT_CACHE_PATH)
+
+# Bumped whenever the pickled layout changes, so stale cache files are ignored
+REFERENCE_CACHE_VERSION = 6
+
+# Read size used when hashing the reference file
+_HASH_CHUNK_SIZE = 1 << 20
 
 ################################################################################
 # Reference Questionnaire Class
@@ -14,8 +50,11 @@ from .Questionnaire import Questionnaire
 Purpose: Subclass of the Questionnaire class.
 
 Attributes:
-    N/A
+    index (hnswlib.Index): The HNSW index over the question embeddings. None until the first large search.
 
+Methods:
+    from_cache(file_path, question_col, answer_col, cache_dir): Load a parsed questionnaire from the disk cache, or build and cache it.
+    get_nearest_questions(query_embeddings, k): Find the k nearest reference questions for each query.
 """
 class Reference_Questionnaire(Questionnaire):
 
@@ -32,4 +71,136 @@ class Reference_Questionnaire(Questionnaire):
         super().__init__(file_path,
                          is_reference=True,
                          question_col=question_col,
-                         answer_col=answer_col)
\ No newline at end of file
+                         answer_col=answer_col)
+
+        # The nearest-neighbour index is built on first use
+        self.index = None
+
+
+
+    """Builds the cache file path for a reference file and its column selection.
+
+        Args:
+            file_path (str): Path to the reference file.
+            question_col (str): The column name for the questions.
+            answer_col (str): The column name for the answers.
+            cache_dir (str): Directory holding the cached questionnaires.
+
+        Returns:
+            str: Path of the pickle file for this file content and column selection.
+    """
+    @staticmethod
+    def _cache_path(file_path, question_col, answer_col, cache_dir):
+
+        # Hashes the file contents in chunks, then the column names and cache version
+        digest = hashlib.sha1()
+        with open(file_path, "rb") as file:
+            for chunk in iter(lambda: file.read(_HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        digest.update(f"\n{question_col}\n{answer_col}\n{REFERENCE_CACHE_VERSION}".encode("utf-8"))
+
+        # Returns the cache file path
+        return os.path.join(cache_dir, f"reference_{digest.hexdigest()}.pkl")
+
+
+
+    """Load a parsed reference questionnaire from the disk cache, or build it and cache it.
+
+        Args:
+            file_path (str): Path to the reference file.
+            question_col (str, optional): The column name for the questions.
+            answer_col (str, optional): The column name for the answers.
+            cache_dir (str, optional): Directory holding the cached questionnaires. Set to None to always parse the file.
+                The cache files are pickles, so loading one can run arbitrary code: never point this at a directory
+                other users can write to.
+
+        Returns:
+            Reference_Questionnaire: The reference questionnaire.
+    """
+    @classmethod
+    def from_cache(cls, file_path, question_col="question", answer_col="answer", cache_dir=DEFAULT_REFERENCE_CACHE_DIR):
+
+        # Parses the file directly when caching is disabled
+        if (cache_dir is None):
+            return cls(file_path, question_col=question_col, answer_col=answer_col)
+
+        # Finds the cache file, parsing directly if the file cannot be hashed (the constructor reports the error)
+        try:
+            cache_path = cls._cache_path(file_path, question_col, answer_col, cache_dir)
+        except OSError:
+            return cls(file_path, question_col=question_col, answer_col=answer_col)
+
+        # Returns the cached questionnaire if there is a readable one
+        try:
+            with open(cache_path, "rb") as file:
+                questionnaire = pickle.load(file)
+            questionnaire.file_path = file_path
+            questionnaire._warn_duplicates()
+            return questionnaire
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Warning: could not read reference cache {cache_path}: {e}")
+
+        # Otherwise parses the file and writes the cache atomically, treating any write error as non-fatal
+        questionnaire = cls(file_path, question_col=question_col, answer_col=answer_col)
+        try:
+            os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+            temp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as file:
+                pickle.dump(questionnaire, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, cache_path)
+        except Exception as e:
+            print(f"Warning: could not write reference cache {cache_path}: {e}")
+
+        # Returns the parsed questionnaire
+        return questionnaire
+
+
+
+    """Builds the HNSW index over the question embeddings.
+
+        Returns:
+            N/A (Setter method for the index)
+    """
+    def _build_index(self):
+
+        # Creates a cosine-space index sized for every reference question
+        index = hnswlib.Index(space="cosine", dim=self.embeddings.shape[1])
+        index.init_index(max_elements=len(self.embeddings), ef_construction=ANN_EF_CONSTRUCTION, M=ANN_M)
+
+        # Adds every embedding, labelled by its position in question_texts
+        index.add_items(self.embeddings.astype(np.float32), ids=np.arange(len(self.embeddings)))
+        self.index = index
+
+
+
+    """Find the k nearest reference questions for each query embedding.
+
+        Args:
+            query_embeddings (np.ndarray): A (N, d) array of query embeddings.
+            k (int): The number of reference questions to return per query.
+
+        Returns:
+            indices (np.ndarray): A (N, min(k, M)) array of positions into question_texts, most similar first.
+            scores (np.ndarray): A (N, min(k, M)) array of the matching cosine similarities.
+    """
+    def get_nearest_questions(self, query_embeddings, k):
+
+        # Raises an error if the reference questions have not been embedded yet
+        if (self.embeddings is None):
+            raise ValueError("ERROR: Reference embeddings not computed. Call get_embeddings() first.")
+
+        # Uses the exact matrix-product search for small questionnaires or when hnswlib is not installed
+        if (hnswlib is None or len(self.embeddings) < ANN_MIN_QUESTIONS):
+            return cosine_topk(query_embeddings, self.embeddings, k)
+
+        # Builds the index once, then searches it for every query at once
+        if (self.index is None):
+            self._build_index()
+        k = min(k, len(self.embeddings))
+        self.index.set_ef(max(ANN_EF_SEARCH, k))
+        labels, distances = self.index.knn_query(normalize_rows(query_embeddings), k=k)
+
+        # Converts cosine distances back to similarities
+        return labels.astype(np.intp), 1.0 - distances
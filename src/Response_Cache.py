@@ -0,0 +1,135 @@
+# Last Updated: 2026-10-14
+# Description: A disk-backed cache of AI responses for Compliance team.
+#              (1) Stores one response per hash of the full chat completion request in a SQLite table.
+#              (2) Lets repeat runs over the same questionnaires skip identical deterministic AI requests.
+
+################################################################################
+# Imports
+################################################################################
+import hashlib
+import json
+import os
+import sqlite3
+from .Embedding_Cache import DEFAULT_CACHE_PATH
+
+################################################################################
+# Constants
+################################################################################
+
+# Default location of the responses cache (next to the embeddings cache)
+DEFAULT_RESPONSE_CACHE_PATH = os.path.join(os.path.dirname(DEFAULT_CACHE_PATH), "responses.sqlite")
+
+# Stays below SQLite's limit on the number of "?" placeholders in a single query
+_MAX_QUERY_VARIABLES = 500
+
+################################################################################
+# Response Cache Class
+################################################################################
+
+"""
+Purpose: Persists AI response contents between runs, keyed by a hash of the chat completion request.
+
+Attributes:
+    cache_path (str): Path to the SQLite database file.
+
+Methods:
+    get_many(requests): Look up the cached response contents for a list of requests.
+    put_many(requests, contents): Store the response contents for a list of requests.
+"""
+class Response_Cache(object):
+
+    """Initialize the Response_Cache class.
+
+        Args:
+            cache_path (str, optional): Path to the SQLite database file. The file is created on first use.
+    """
+    def __init__(self, cache_path=DEFAULT_RESPONSE_CACHE_PATH):
+
+        # Sets class attributes
+        self.cache_path = cache_path
+        self._connection = None
+
+
+
+    """Opens the database connection and creates the table on first use.
+
+        Returns:
+            sqlite3.Connection: The database connection.
+    """
+    def _connect(self):
+
+        # Creates the connection only once
+        if (self._connection is None):
+            cache_dir = os.path.dirname(self.cache_path)
+            if (cache_dir):
+                os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+            self._connection = sqlite3.connect(self.cache_path)
+            self._connection.execute("CREATE TABLE IF NOT EXISTS responses (hash BLOB PRIMARY KEY, content TEXT)")
+
+        # Returns the connection
+        return self._connection
+
+
+
+    """Hashes a chat completion request (model, messages, temperature, token limit and response format).
+
+        Args:
+            request (dict): The keyword arguments for chat.completions.create.
+
+        Returns:
+            bytes: The SHA-256 digest of the canonical JSON request.
+    """
+    def _hash(self, request):
+        return hashlib.sha256(json.dumps(request, sort_keys=True, ensure_ascii=False).encode("utf-8")).digest()
+
+
+
+    """Look up the cached response contents for a list of requests.
+
+        Args:
+            requests (list): The chat completion requests.
+
+        Returns:
+            list: The cached response content of each request, or None where it is not cached.
+    """
+    def get_many(self, requests):
+
+        # Hashes every request, keeping the order
+        hashes = [self._hash(request) for request in requests]
+        found = {}
+
+        # Looks up the hashes in as few queries as possible, treating any database error as a cache miss
+        try:
+            connection = self._connect()
+            unique_hashes = list(dict.fromkeys(hashes))
+            for start in range(0, len(unique_hashes), _MAX_QUERY_VARIABLES):
+                chunk = unique_hashes[start:start + _MAX_QUERY_VARIABLES]
+                placeholders = ",".join("?" * len(chunk))
+                rows = connection.execute(f"SELECT hash, content FROM responses WHERE hash IN ({placeholders})", chunk)
+                found.update(rows)
+        except (sqlite3.Error, OSError) as e:
+            print(f"Warning: could not read responses cache {self.cache_path}: {e}")
+
+        # Returns the cached contents in request order
+        return [found.get(request_hash) for request_hash in hashes]
+
+
+
+    """Store the response contents for a list of requests.
+
+        Args:
+            requests (list): The chat completion requests.
+            contents (list): The response content of each request.
+    """
+    def put_many(self, requests, contents):
+
+        # Pairs each request hash with its response content
+        rows = [(self._hash(request), content) for request, content in zip(requests, contents)]
+
+        # Writes every row in one transaction, treating any database error as non-fatal
+        try:
+            connection = self._connect()
+            with connection:
+                connection.executemany("INSERT OR REPLACE INTO responses (hash, content) VALUES (?, ?)", rows)
+        except (sqlite3.Error, OSError) as e:
+            print(f"Warning: could not write responses cache {self.cache_path}: {e}")
@@ -1,6 +1,6 @@
 # Compliance Questionnaire Package
 # Author: Austin Bennett, Circle Research
-# Last Updated: 2025-08-19
+# Last Updated: 2026-10-14
 
 """
 Compliance Questionnaire Package
@@ -11,18 +11,59 @@ This package provides automated questionnaire matching using AI-powered semantic
 __version__ = "1.0.0"
 __author__ = "Austin Bennett, Circle Research"
 
-# Import main classes for easy access
-from .Questionnaire_Filler import Questionnaire_Filler
+import importlib
+
+# Import the questionnaire and cache classes for easy access. Importing them eagerly binds each class over the
+# same-named submodule, so src.Question stays the class even after "from src.Question import Question"
 from .Question import Question
 from .Questionnaire import Questionnaire
 from .Reference_Questionnaire import Reference_Questionnaire
 from .Unanswered_Questionnaire import Unanswered_Questionnaire
+from .Embedding_Cache import Embedding_Cache
+from .Response_Cache import Response_Cache
+
+# Maps each lazily exported class to the module defining it. These are imported on first access (PEP 562), so
+# CSV-only users of the package do not pay for the AI client and the Excel writer
+_LAZY_EXPORTS = {
+    'Questionnaire_Filler': '.Questionnaire_Filler'
+}
 
 __all__ = [
     'Questionnaire_Filler',
-    'Question', 
+    'Question',
     'Questionnaire',
     'Reference_Questionnaire',
-    'Unanswered_Questionnaire'
+    'Unanswered_Questionnaire',
+    'Embedding_Cache',
+    'Response_Cache'
 ]
 
+
+"""Imports a lazily exported class the first time it is accessed.
+
+    Args:
+        name (str): The attribute name.
+
+    Returns:
+        type: The exported class.
+"""
+def __getattr__(name):
+
+    # Raises the usual error for names the package does not export
+    if (name not in _LAZY_EXPORTS):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    # Imports the class's module and binds the class on the package, so later lookups skip this hook
+    module = importlib.import_module(_LAZY_EXPORTS[name], __name__)
+    globals()[name] = getattr(module, name)
+    return globals()[name]
+
+
+
+"""Lists the package attributes, including the exported classes that have not been imported yet.
+
+    Returns:
+        list: The attribute names.
+"""
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
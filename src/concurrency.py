@@ -0,0 +1,58 @@
+# Last Updated: 2026-10-14
+# Description: Helpers for running independent AI requests concurrently from synchronous code.
+#              (1) Runs a coroutine to completion, including from notebooks that already run an event loop.
+#              (2) Gathers many awaitables while bounding how many are in flight at once.
+
+################################################################################
+# Imports
+################################################################################
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+################################################################################
+# Concurrency Functions
+################################################################################
+
+"""Runs a coroutine to completion from synchronous code.
+
+    Args:
+        coro (coroutine): The coroutine to run.
+
+    Returns:
+        any: The coroutine's result.
+"""
+def run_coroutine(coro):
+
+    # Uses a fresh event loop when none is running (command line)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    # Otherwise runs the coroutine on its own loop in a worker thread (e.g. inside Jupyter)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+
+"""Awaits a list of coroutine factories concurrently, with at most max_concurrency in flight.
+
+    Args:
+        factories (list): Zero-argument callables that each return an awaitable.
+        max_concurrency (int): The maximum number of awaitables running at once.
+
+    Returns:
+        list: The results, in the same order as factories.
+"""
+async def gather_bounded(factories, max_concurrency):
+
+    # Limits the number of in-flight requests (e.g. to respect API rate limits)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    # Starts each awaitable only once a slot is free
+    async def run_limited(factory):
+        async with semaphore:
+            return await factory()
+
+    # Returns the results in submission order
+    return await asyncio.gather(*(run_limited(factory) for factory in factories))
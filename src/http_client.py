@@ -0,0 +1,50 @@
+# Last Updated: 2026-10-14
+# Description: A shared HTTP client for the ChatAI API.
+#              (1) Lazily builds one pooled httpx.Client per process.
+#              (2) Reuses keep-alive connections so repeated AI requests skip the TCP/TLS handshake.
+#              (3) Multiplexes concurrent requests over one connection with HTTP/2 when h2 is installed.
+
+################################################################################
+# Imports
+################################################################################
+import atexit
+import httpx
+
+# Optional: h2 lets httpx speak HTTP/2, otherwise requests use HTTP/1.1
+try:
+    import h2
+except ImportError:
+    h2 = None
+
+################################################################################
+# Constants
+################################################################################
+
+# Timeout for AI requests (long completions can take close to a minute), failing fast on unreachable hosts
+HTTP_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+
+# Connection pool sizing for the shared client
+HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+
+# The shared client, built on first use
+_HTTP_CLIENT = None
+
+################################################################################
+# HTTP Client Functions
+################################################################################
+
+"""Get the shared HTTP client, creating it on first use.
+
+    Returns:
+        httpx.Client: The pooled HTTP client, closed automatically when the process exits.
+"""
+def get_http_client():
+    global _HTTP_CLIENT
+
+    # Builds the pooled client once and closes it at interpreter exit
+    if (_HTTP_CLIENT is None):
+        _HTTP_CLIENT = httpx.Client(timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS, http2=h2 is not None)
+        atexit.register(_HTTP_CLIENT.close)
+
+    # Returns the shared client
+    return _HTTP_CLIENT
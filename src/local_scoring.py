@@ -0,0 +1,205 @@
+# Last Updated: 2026-10-14
+# Description: Local answer similarity helpers that settle clear-cut answer pairs without an AI request.
+#              Only answers equal up to case and spacing, or long answers with nothing in common, are settled.
+#              (1) Normalized Levenshtein ratio over code points, JIT-compiled with numba when it is installed.
+#              (2) Token Jaccard similarity over casefolded words.
+
+################################################################################
+# Imports
+################################################################################
+import re
+import numpy as np
+
+# Optional: numba compiles the edit distance kernel to machine code, otherwise a row-vectorized numpy kernel is used
+try:
+    import numba
+except ImportError:
+    numba = None
+
+################################################################################
+# Constants
+################################################################################
+
+# Answer pairs are only scored as different when each has at least this many words, no word in common and
+# a character similarity below DIFFERENT_RATIO (short answers such as "Yes" and "Implemented" are left to the model)
+MIN_DIFFERENT_WORDS = 5
+DIFFERENT_RATIO = 0.3
+
+# Words that flip or qualify an answer, so pairs containing them are always left to the model
+# (contractions such as "don't" split into "don" and "t")
+NEGATION_WORDS = frozenset({"no", "not", "never", "none", "nor", "neither", "without", "cannot", "t"})
+
+# Groups of words that can answer a question the same way, so a pair sharing a group is not fully disjoint
+SYNONYM_GROUPS = (
+    frozenset({"yes", "true", "implemented", "enabled", "compliant", "confirmed", "supported", "applicable"}),
+    frozenset({"false", "na", "disabled", "unsupported", "inapplicable", "unavailable"}),
+)
+
+# A run of letters or digits in any script
+_TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+################################################################################
+# Edit Distance Kernels
+################################################################################
+
+if (numba is not None):
+
+    """Computes the Levenshtein distance between two code point arrays with the classic two-row DP.
+
+        Args:
+            a (np.ndarray): The uint32 code points of the first string.
+            b (np.ndarray): The uint32 code points of the second string.
+
+        Returns:
+            int: The number of single-character edits that turn a into b.
+    """
+    @numba.njit(cache=True)
+    def _levenshtein_distance(a, b):
+        previous = np.arange(len(b) + 1)
+        current = np.empty(len(b) + 1, dtype=previous.dtype)
+        for i in range(1, len(a) + 1):
+            current[0] = i
+            for j in range(1, len(b) + 1):
+                cost = 0 if a[i - 1] == b[j - 1] else 1
+                current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            previous, current = current, previous
+        return previous[len(b)]
+
+else:
+
+    """Computes the Levenshtein distance between two code point arrays, one numpy pass per row.
+
+        Args:
+            a (np.ndarray): The uint32 code points of the first string.
+            b (np.ndarray): The uint32 code points of the second string.
+
+        Returns:
+            int: The number of single-character edits that turn a into b.
+    """
+    def _levenshtein_distance(a, b):
+        offsets = np.arange(len(b) + 1)
+        previous = offsets.copy()
+        for i in range(1, len(a) + 1):
+
+            # Takes the best of a deletion or a substitution for every column
+            candidates = np.empty_like(previous)
+            candidates[0] = i
+            np.minimum(previous[1:] + 1, previous[:-1] + (b != a[i - 1]), out=candidates[1:])
+
+            # Resolves the insertion chain along the row with a running minimum
+            previous = np.minimum.accumulate(candidates - offsets) + offsets
+        return int(previous[len(b)])
+
+################################################################################
+# Similarity Functions
+################################################################################
+
+"""Converts a string to an array of its code points.
+
+    Args:
+        text (str): The string to convert.
+
+    Returns:
+        np.ndarray: A uint32 array with one element per character.
+"""
+def _code_points(text):
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+
+
+
+"""Computes the normalized Levenshtein similarity of two strings.
+
+    Args:
+        a (str): The first string.
+        b (str): The second string.
+
+    Returns:
+        float: 1 minus the edit distance over the longer length, from 0.0 (nothing shared) to 1.0 (identical).
+"""
+def lev_ratio(a, b):
+
+    # Treats two empty strings as identical
+    longest = max(len(a), len(b))
+    if (longest == 0):
+        return 1.0
+
+    # Returns the similarity
+    return 1.0 - _levenshtein_distance(_code_points(a), _code_points(b)) / longest
+
+
+
+"""Collects the casefolded words of a string.
+
+    Args:
+        text (str): The string to split.
+
+    Returns:
+        set: The distinct runs of letters or digits.
+"""
+def _words(text):
+    return set(_TOKEN_PATTERN.findall(text.casefold()))
+
+
+
+"""Computes the Jaccard similarity of the word sets of two strings.
+
+    Args:
+        a (str): The first string.
+        b (str): The second string.
+
+    Returns:
+        float: The shared words over all words, from 0.0 to 1.0.
+"""
+def token_jaccard(a, b):
+
+    # Collects the casefolded words of each string
+    a_tokens = _words(a)
+    b_tokens = _words(b)
+
+    # Treats two strings without words as identical
+    all_tokens = a_tokens | b_tokens
+    if (len(all_tokens) == 0):
+        return 1.0
+
+    # Returns the similarity
+    return len(a_tokens & b_tokens) / len(all_tokens)
+
+
+
+"""Scores an answer pair locally when it is clearly the same or clearly different.
+
+    Args:
+        a (str): The first answer.
+        b (str): The second answer.
+
+    Returns:
+        float: 1.0 for the same answer, 0.0 for different answers, or None if the pair needs an AI score.
+"""
+def local_answer_score(a, b):
+
+    # Scores answers that are equal ignoring case and spacing as the same answer
+    a = " ".join(a.casefold().split())
+    b = " ".join(b.casefold().split())
+    if (a == b):
+        return 1.0
+
+    # Leaves short answers, numbers and negations to the AI model
+    a_tokens = _words(a)
+    b_tokens = _words(b)
+    if (min(len(a_tokens), len(b_tokens)) < MIN_DIFFERENT_WORDS):
+        return None
+    all_tokens = a_tokens | b_tokens
+    if (any(character.isdigit() for character in a + b) or not all_tokens.isdisjoint(NEGATION_WORDS)):
+        return None
+
+    # Leaves answers sharing a word, or a word from the same synonym group, to the AI model
+    if (not a_tokens.isdisjoint(b_tokens)):
+        return None
+    for group in SYNONYM_GROUPS:
+        if (not a_tokens.isdisjoint(group) and not b_tokens.isdisjoint(group)):
+            return None
+
+    # Scores long, fully disjoint answers with little character overlap as different answers
+    if (lev_ratio(a, b) < DIFFERENT_RATIO):
+        return 0.0
+    return None
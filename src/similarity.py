@@ -0,0 +1,108 @@
+# Last Updated: 2026-10-14
+# Description: Vectorized cosine similarity helpers for comparing question embeddings.
+
+################################################################################
+# Imports
+################################################################################
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+################################################################################
+# Constants
+################################################################################
+
+# Number of query rows scored per chunk, bounding each similarity matrix to QUERY_CHUNK_SIZE x M
+QUERY_CHUNK_SIZE = 1024
+
+################################################################################
+# Similarity Functions
+################################################################################
+
+"""L2-normalizes each row of an embedding matrix.
+
+    Args:
+        embeddings (np.ndarray): A (N, d) array of embeddings.
+
+    Returns:
+        np.ndarray: A contiguous (N, d) float32 array whose rows have unit length (zero rows are left as zeros).
+"""
+def normalize_rows(embeddings):
+
+    # Converts to a contiguous float32 array so the matrix product runs in BLAS
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+
+    # Divides each row by its norm, guarding against zero-length rows
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+
+    # Returns the normalized rows
+    return embeddings / norms
+
+
+
+"""Selects the k most similar candidates for a chunk of normalized query rows.
+
+    Args:
+        A (np.ndarray): A (n, d) array of normalized query embeddings.
+        B (np.ndarray): A (M, d) array of normalized candidate embeddings.
+        k (int): The number of candidates to return per query, at most M.
+
+    Returns:
+        indices (np.ndarray): A (n, k) array of candidate row indices, most similar first.
+        scores (np.ndarray): A (n, k) array of the matching cosine similarities.
+"""
+def _topk_rows(A, B, k):
+
+    # Computes every query/candidate similarity with a single matrix product
+    sims = A @ B.T
+
+    # Selects the top k candidates per row without fully sorting every row
+    indices = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    scores = np.take_along_axis(sims, indices, axis=1)
+
+    # Orders the selected candidates from most to least similar
+    order = np.argsort(-scores, axis=1, kind="stable")
+    indices = np.take_along_axis(indices, order, axis=1)
+    scores = np.take_along_axis(scores, order, axis=1)
+
+    # Returns the candidate indices and their similarities
+    return indices, scores
+
+
+
+"""Finds the k most similar candidate rows for every query row by cosine similarity.
+
+    Args:
+        A (np.ndarray): A (N, d) array of query embeddings.
+        B (np.ndarray): A (M, d) array of candidate embeddings.
+        k (int): The number of candidates to return per query.
+        max_workers (int, optional): The number of threads scoring query chunks. Defaults to the CPU count.
+
+    Returns:
+        indices (np.ndarray): A (N, min(k, M)) array of candidate row indices, most similar first.
+        scores (np.ndarray): A (N, min(k, M)) array of the matching cosine similarities.
+"""
+def cosine_topk(A, B, k, max_workers=None):
+
+    # Limits k to the number of candidates
+    k = min(k, len(B))
+    if (len(A) == 0 or k <= 0):
+        return np.empty((len(A), 0), dtype=np.intp), np.empty((len(A), 0), dtype=np.float32)
+
+    # Normalizes both sides once
+    A = normalize_rows(A)
+    B = normalize_rows(B)
+
+    # Scores small query sets directly
+    if (len(A) <= QUERY_CHUNK_SIZE):
+        return _topk_rows(A, B, k)
+
+    # Scores larger query sets chunk by chunk across threads (numpy releases the GIL in the matrix product and partition)
+    chunks = [A[start:start + QUERY_CHUNK_SIZE] for start in range(0, len(A), QUERY_CHUNK_SIZE)]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda chunk: _topk_rows(chunk, B, k), chunks))
+
+    # Reassembles the chunks in query order
+    indices = np.concatenate([chunk_indices for chunk_indices, _ in results])
+    scores = np.concatenate([chunk_scores for _, chunk_scores in results])
+    return indices, scores
@@ -15,12 +15,25 @@ import tempfile
 from unittest.mock import patch, Mock
 
 # Add the src directory to the Python path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+_REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
 
 from src.Questionnaire_Filler import Questionnaire_Filler
 from src.Reference_Questionnaire import Reference_Questionnaire
 from src.Unanswered_Questionnaire import Unanswered_Questionnaire
 from src.Question import Question
+from src.Embedding_Cache import Embedding_Cache
+questionnaire_module = sys.modules['src.Questionnaire']
+
+# Environment variables served by the patched os.getenv
+_TEST_ENVIRONMENT = {
+    'CHATAI_BASE_URL': 'http://test-url.com',
+    'CHATAI_API_KEY': 'test-key'
+}
+
+# Keeps the embeddings, responses and reference caches off the developer's real cache directory
+_NO_DISK_CACHES = dict(embedding_cache_path=None, response_cache_path=None, reference_cache_dir=None)
 
 
 class TestCSVIntegration(unittest.TestCase):
@@ -82,10 +95,7 @@ class TestCSVIntegration(unittest.TestCase):
     def test_questionnaire_filler_initialization_with_real_csvs(self, mock_getenv, mock_exists):
         """Test that Questionnaire_Filler can initialize with real CSV files."""
         # Mock environment variables
-        mock_getenv.side_effect = lambda key: {
-            'CHATAI_BASE_URL': 'http://test-url.com',
-            'CHATAI_API_KEY': 'test-key'
-        }.get(key)
+        mock_getenv.side_effect = _TEST_ENVIRONMENT.get
         
         # Should not raise any exceptions
         filler = Questionnaire_Filler(
@@ -94,13 +104,29 @@ class TestCSVIntegration(unittest.TestCase):
             reference_answer_col="Answer - Full",
             unanswered_file_name=self.unanswered_csv,
             unanswered_question_col="Question - Full",
-            unanswered_answer_col="Answer - Full"
+            unanswered_answer_col="Answer - Full",
+            **_NO_DISK_CACHES
         )
         
         # Verify questionnaire objects were created
         self.assertIsInstance(filler.reference_questionnaire, Reference_Questionnaire)
         self.assertIsInstance(filler.unanswered_questionnaire, Unanswered_Questionnaire)
 
+    @patch('os.path.exists', return_value=True)
+    @patch('os.getenv')
+    def test_questionnaire_filler_from_loaded_questionnaires(self, mock_getenv, mock_exists):
+        """Test that Questionnaire_Filler.from_questionnaires uses the given questionnaires without reading files."""
+        mock_getenv.side_effect = _TEST_ENVIRONMENT.get
+        ref_q = Reference_Questionnaire(self.reference_csv, "Question - Full", "Answer - Full")
+        unans_q = Unanswered_Questionnaire(self.unanswered_csv, "Question - Full", "Answer - Full")
+        
+        with patch.object(Reference_Questionnaire, '_read_file', side_effect=AssertionError("file was re-read")):
+            filler = Questionnaire_Filler.from_questionnaires(ref_q, unans_q, accuracy_threshold=0.9, **_NO_DISK_CACHES)
+        
+        self.assertIs(filler.reference_questionnaire, ref_q)
+        self.assertIs(filler.unanswered_questionnaire, unans_q)
+        self.assertEqual(filler.accuracy_threshold, 0.9)
+
     def test_reference_questionnaire_csv_reading(self):
         """Test that Reference_Questionnaire correctly reads CSV data."""
         ref_q = Reference_Questionnaire(
@@ -165,6 +191,232 @@ class TestCSVIntegration(unittest.TestCase):
         self.assertTrue(question_obj.is_reference)
         self.assertIsInstance(question_obj.get_question_id(), int)
 
+    def test_columnar_question_arrays(self):
+        """Test that the columnar question texts line up with the questions mapping."""
+        ref_q = Reference_Questionnaire(
+            file_path=self.reference_csv,
+            question_col="Question - Full",
+            answer_col="Answer - Full"
+        )
+
+        questions = ref_q.get_questions()
+        self.assertEqual(list(ref_q.question_texts), list(questions.keys()))
+
+        # The question positions are built once and line up with the texts
+        positions = ref_q.get_question_positions()
+        self.assertIs(ref_q.get_question_positions(), positions)
+        self.assertEqual([ref_q.question_texts[positions[question]] for question in questions], list(questions))
+
+        # The questions mapping returned to callers is read-only
+        with self.assertRaises(TypeError):
+            questions['New question?'] = None
+
+    def test_embeddings_use_single_batched_request(self):
+        """Test that all questions are embedded with one batched request, in question order."""
+        ref_q = Reference_Questionnaire(
+            file_path=self.reference_csv,
+            question_col="Question - Full",
+            answer_col="Answer - Full"
+        )
+
+        # Mock embedding client returning one vector per input, in reverse order
+        mock_client = Mock()
+        texts = list(ref_q.get_questions().keys())
+        mock_client.embeddings.create.return_value = Mock(data=[
+            Mock(index=i, embedding=[float(i), 1.0]) for i in reversed(range(len(texts)))
+        ])
+
+        embeddings = ref_q.get_embeddings(mock_client, "test-embedding-model")
+
+        # One request with every question, and rows re-ordered to match the questions
+        mock_client.embeddings.create.assert_called_once_with(model="test-embedding-model", input=texts)
+        self.assertEqual(embeddings.shape, (4, 2))
+        self.assertEqual(embeddings.dtype, np.float16)
+
+        # Rows are stored unit-length: [2, 1] / sqrt(5)
+        np.testing.assert_allclose(embeddings[2].astype(np.float32), [2 / np.sqrt(5), 1 / np.sqrt(5)], atol=1e-3)
+        np.testing.assert_allclose(np.linalg.norm(embeddings.astype(np.float32), axis=1), 1.0, atol=1e-3)
+
+        # Embeddings are computed once and reused
+        ref_q.get_embeddings(mock_client, "test-embedding-model")
+        self.assertEqual(mock_client.embeddings.create.call_count, 1)
+
+    @patch('src.Questionnaire.EMBEDDING_BATCH_SIZE', 3)
+    def test_embeddings_split_into_concurrent_batches(self):
+        """Test that large questionnaires are embedded in several batches that are stitched back in order."""
+        unans_q = Unanswered_Questionnaire(self.unanswered_csv, "Question - Full", "Answer - Full")
+        texts = list(unans_q.get_questions().keys())
+        mock_client = Mock()
+        mock_client.embeddings.create.side_effect = lambda model, input: Mock(data=[
+            Mock(index=i, embedding=[float(texts.index(text)), 1.0]) for i, text in enumerate(input)
+        ])
+
+        embeddings = unans_q.get_embeddings(mock_client, "test-embedding-model")
+
+        # 6 questions with a batch size of 3 -> 2 requests, rows in question order
+        # ([i, 1] normalized, so the second component shrinks as i grows)
+        self.assertEqual(mock_client.embeddings.create.call_count, 2)
+        np.testing.assert_array_less(np.diff(embeddings[:, 1].astype(np.float32)), 0)
+
+    def test_embeddings_cache_skips_cached_questions(self):
+        """Test that a second questionnaire reuses cached embeddings and only embeds new questions."""
+        cache = Embedding_Cache(os.path.join(self.temp_dir, 'embeddings.sqlite'))
+        mock_client = Mock()
+        mock_client.embeddings.create.side_effect = lambda model, input: Mock(data=[
+            Mock(index=i, embedding=[float(len(text)), 1.0]) for i, text in enumerate(input)
+        ])
+
+        # First run embeds every reference question
+        ref_q = Reference_Questionnaire(self.reference_csv, "Question - Full", "Answer - Full")
+        first = ref_q.get_embeddings(mock_client, "test-embedding-model", cache)
+        self.assertEqual(mock_client.embeddings.create.call_count, 1)
+
+        # Second run of the same file is served from the cache
+        ref_q_again = Reference_Questionnaire(self.reference_csv, "Question - Full", "Answer - Full")
+        second = ref_q_again.get_embeddings(mock_client, "test-embedding-model", cache)
+        self.assertEqual(mock_client.embeddings.create.call_count, 1)
+        np.testing.assert_array_equal(first, second)
+
+        # A questionnaire with new questions only requests the misses
+        unans_q = Unanswered_Questionnaire(self.unanswered_csv, "Question - Full", "Answer - Full")
+        unans_q.get_embeddings(mock_client, "test-embedding-model", cache)
+        requested = mock_client.embeddings.create.call_args[1]['input']
+        self.assertNotIn('What is your company name?', requested)
+        self.assertIn('Do you use cloud services?', requested)
+
+    def test_nearest_reference_questions(self):
+        """Test nearest-neighbour search over the reference embeddings, with and without an HNSW index."""
+        reference_module = sys.modules[Reference_Questionnaire.__module__]
+
+        ref_q = Reference_Questionnaire(self.reference_csv, "Question - Full", "Answer - Full")
+        rng = np.random.default_rng(0)
+        ref_q.embeddings = rng.normal(size=(4, 8)).astype(np.float16)
+        queries = ref_q.embeddings[[2, 0]].astype(np.float32)
+
+        # Small questionnaires use the exact search
+        indices, scores = ref_q.get_nearest_questions(queries, 1)
+        np.testing.assert_array_equal(indices[:, 0], [2, 0])
+        self.assertIsNone(ref_q.index)
+
+        # Large questionnaires go through the HNSW index when hnswlib is installed
+        if reference_module.hnswlib is not None:
+            with patch.object(reference_module, 'ANN_MIN_QUESTIONS', 1):
+                indices, scores = ref_q.get_nearest_questions(queries, 2)
+            self.assertIsNotNone(ref_q.index)
+            np.testing.assert_array_equal(indices[:, 0], [2, 0])
+            np.testing.assert_allclose(scores[:, 0], 1.0, atol=1e-3)
+
+    def test_csv_reads_only_question_and_answer_columns(self):
+        """Test that other columns are skipped and answers are read as strings."""
+        wide_csv = os.path.join(self.temp_dir, 'wide.csv')
+        wide_data = dict(self.reference_data, **{'Owner': ['a', 'b', 'c', 'd'], 'Score': [1, 2, 3, 4]})
+        pd.DataFrame(wide_data).to_csv(wide_csv, index=False)
+
+        ref_q = Reference_Questionnaire(wide_csv, "Question - Full", "Answer - Full")
+
+        self.assertEqual(list(ref_q.get_data().columns), ["Question - Full", "Answer - Full"])
+        self.assertEqual(ref_q.get_questions()['How many employees do you have?'].get_answer(), '150')
+
+    def test_csv_short_rows_padded_on_both_readers(self):
+        """Test that short rows get empty answers with the pyarrow reader (when installed) and the pandas reader."""
+        ragged_csv = os.path.join(self.temp_dir, 'ragged.csv')
+        with open(ragged_csv, 'w') as file:
+            file.write('Question - Full,Answer - Full,Owner\nFirst question?,First answer,a\nShort question?\nSecond question?,Second answer\n')
+
+        for pacsv in (questionnaire_module.pacsv, None):
+            with self.subTest(pyarrow=pacsv is not None), patch.object(questionnaire_module, 'pacsv', pacsv):
+                ref_q = Reference_Questionnaire(ragged_csv, "Question - Full", "Answer - Full")
+
+                self.assertEqual(list(ref_q.get_data().columns), ["Question - Full", "Answer - Full"])
+                self.assertEqual(ref_q.get_data()["Answer - Full"].tolist(), ['First answer', '', 'Second answer'])
+                self.assertEqual(ref_q.get_questions()['Short question?'].get_answer(), '')
+
+    @unittest.skipIf(questionnaire_module.paparquet is None, "pyarrow is not installed")
+    def test_parquet_reads_only_question_and_answer_columns(self):
+        """Test that Parquet input is read like CSV: only the two columns, as strings, with empty strings for nulls."""
+        wide_parquet = os.path.join(self.temp_dir, 'wide.parquet')
+        wide_data = dict(self.unanswered_data, **{'Score': [1, 2, 3, 4, 5, 6]})
+        wide_data['Answer - Full'] = pd.array([150, 2, None, 4, 5, 6], dtype='Int64')
+        pd.DataFrame(wide_data).to_parquet(wide_parquet, index=False)
+
+        unanswered_q = Unanswered_Questionnaire(wide_parquet, "Question - Full", "Answer - Full")
+
+        self.assertEqual(list(unanswered_q.get_data().columns), ["Question - Full", "Answer - Full"])
+        answers = unanswered_q.get_data()["Answer - Full"].tolist()
+        self.assertEqual(answers[0], '150')
+        self.assertEqual(answers[2], '')
+
+    @patch('builtins.print')
+    def test_duplicate_questions_warn_and_keep_last(self, mock_print):
+        """Test that repeated questions keep the last row and print a warning."""
+        duplicate_csv = os.path.join(self.temp_dir, 'duplicates.csv')
+        pd.DataFrame({'Question - Full': ['Same question?', 'Other question?', 'Same  question?'],
+                      'Answer - Full': ['First', 'Other', 'Last']}).to_csv(duplicate_csv, index=False)
+
+        ref_q = Reference_Questionnaire(duplicate_csv, "Question - Full", "Answer - Full")
+
+        self.assertEqual(ref_q.get_questions()['Same question?'].get_answer(), 'Last')
+        self.assertEqual(ref_q.get_questions()['Same question?'].get_question_id(), 2)
+        self.assertIn("1 duplicate question(s)", mock_print.call_args[0][0])
+
+    @patch('builtins.print')
+    def test_duplicate_questions_warn_on_cache_hit(self, mock_print):
+        """Test that a reference loaded from the disk cache repeats the duplicate-question warning."""
+        duplicate_csv = os.path.join(self.temp_dir, 'duplicates.csv')
+        pd.DataFrame({'Question - Full': ['Same question?', 'Same question?'],
+                      'Answer - Full': ['First', 'Last']}).to_csv(duplicate_csv, index=False)
+        cache_dir = os.path.join(self.temp_dir, 'reference_cache')
+        Reference_Questionnaire.from_cache(duplicate_csv, "Question - Full", "Answer - Full", cache_dir)
+        mock_print.reset_mock()
+
+        with patch.object(Reference_Questionnaire, '_read_file', side_effect=AssertionError("file was re-read")):
+            Reference_Questionnaire.from_cache(duplicate_csv, "Question - Full", "Answer - Full", cache_dir)
+
+        self.assertIn("1 duplicate question(s)", mock_print.call_args[0][0])
+
+    def test_cleaned_questions_are_interned(self):
+        """Test that the same question read from two files is stored as one shared string."""
+        ref_q = Reference_Questionnaire(self.reference_csv, "Question - Full", "Answer - Full")
+        unans_q = Unanswered_Questionnaire(self.unanswered_csv, "Question - Full", "Answer - Full")
+
+        ref_text = ref_q.get_questions()['What is your company name?'].get_question()
+        unans_text = unans_q.get_questions()['What is your company name?'].get_question()
+        self.assertIs(ref_text, unans_text)
+
+    def test_question_cleaning_ascii_and_unicode(self):
+        """Test that column-wise cleaning matches per-question cleaning for ASCII and non-ASCII text."""
+        ref_q = Reference_Questionnaire(self.reference_csv, "Question - Full", "Answer - Full")
+        raw = pd.Series(["  Plain   ASCII question? ", "Ｆｕｌｌ\u00a0width question?", "Caf\u00e9  policy?"])
+
+        cleaned = ref_q._clean_question_column(raw).tolist()
+
+        self.assertEqual(cleaned, ["Plain ASCII question?", "Full width question?", "Caf\u00e9 policy?"])
+        self.assertEqual(cleaned, [ref_q._clean_question(text) for text in raw])
+        self.assertEqual(raw[1], "Ｆｕｌｌ\u00a0width question?")
+
+    def test_missing_file_raises_file_not_found(self):
+        """Test that a missing input file raises FileNotFoundError with the path in the message."""
+        missing_csv = os.path.join(self.temp_dir, 'missing.csv')
+        with self.assertRaises(FileNotFoundError) as context:
+            Reference_Questionnaire(missing_csv, "Question - Full", "Answer - Full")
+        self.assertIn(missing_csv, str(context.exception))
+
+    def test_reference_questionnaire_disk_cache(self):
+        """Test that the parsed reference questionnaire is reused until the file or columns change."""
+        cache_dir = os.path.join(self.temp_dir, 'reference_cache')
+        first = Reference_Questionnaire.from_cache(self.reference_csv, "Question - Full", "Answer - Full", cache_dir)
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+        # A second load comes from the cache without parsing the file again
+        with patch.object(Reference_Questionnaire, '_read_file', side_effect=AssertionError("file was re-parsed")):
+            cached = Reference_Questionnaire.from_cache(self.reference_csv, "Question - Full", "Answer - Full", cache_dir)
+        self.assertEqual(list(cached.get_questions()), list(first.get_questions()))
+        self.assertEqual(cached.get_questions()['What is your company name?'].get_answer(), 'Acme Corp')
+
+        # Different columns use a separate cache entry
+        Reference_Questionnaire.from_cache(self.reference_csv, "Answer - Full", "Question - Full", cache_dir)
+        self.assertEqual(len(os.listdir(cache_dir)), 2)
+
     def test_csv_data_types_handling(self):
         """Test handling of various data types from CSV files."""
         unans_q = Unanswered_Questionnaire(
@@ -199,10 +451,7 @@ class TestCSVIntegration(unittest.TestCase):
     def test_exact_matching_with_real_data(self, mock_getenv, mock_exists):
         """Test exact question matching with real CSV data."""
         # Mock environment variables
-        mock_getenv.side_effect = lambda key: {
-            'CHATAI_BASE_URL': 'http://test-url.com',
-            'CHATAI_API_KEY': 'test-key'
-        }.get(key)
+        mock_getenv.side_effect = _TEST_ENVIRONMENT.get
         
         filler = Questionnaire_Filler(
             reference_file_name=self.reference_csv,
@@ -210,7 +459,8 @@ class TestCSVIntegration(unittest.TestCase):
             reference_answer_col="Answer - Full",
             unanswered_file_name=self.unanswered_csv,
             unanswered_question_col="Question - Full",
-            unanswered_answer_col="Answer - Full"
+            unanswered_answer_col="Answer - Full",
+            **_NO_DISK_CACHES
         )
         
         # Test exact matching
@@ -228,15 +478,63 @@ class TestCSVIntegration(unittest.TestCase):
         self.assertEqual(company_question.get_reference_question(), 'What is your company name?')
         self.assertEqual(company_question.get_question_match_score(), 1)
 
+    @patch('os.getenv')
+    def test_combined_questionnaire_excel_styling(self, mock_getenv):
+        """Test the styled Excel output with xlsxwriter and with the openpyxl fallback."""
+        import openpyxl
+
+        # Mock environment variables
+        mock_getenv.side_effect = _TEST_ENVIRONMENT.get
+
+        filler = Questionnaire_Filler(
+            reference_file_name=self.reference_csv,
+            reference_question_col="Question - Full",
+            reference_answer_col="Answer - Full",
+            unanswered_file_name=self.unanswered_csv,
+            unanswered_question_col="Question - Full",
+            unanswered_answer_col="Answer - Full",
+            **_NO_DISK_CACHES
+        )
+        filler._match_exact_questions()
+        filler_module = sys.modules[Questionnaire_Filler.__module__]
+
+        for engine in ("xlsxwriter", "openpyxl"):
+            with self.subTest(engine=engine):
+                if engine == "xlsxwriter" and filler_module.xlsxwriter is None:
+                    continue
+                output_xlsx = os.path.join(self.temp_dir, f'combined_{engine}.xlsx')
+                with patch('builtins.print'):
+                    if engine == "openpyxl":
+                        with patch.object(filler_module, 'xlsxwriter', None):
+                            filler.generate_combined_questionnaire(output_xlsx)
+                    else:
+                        filler.generate_combined_questionnaire(output_xlsx)
+
+                workbook = openpyxl.load_workbook(output_xlsx)
+                worksheet = workbook['Combined Questionnaire']
+                self.assertEqual(worksheet.max_row, 7)
+                self.assertEqual(worksheet['A2'].value, 'What is your company name?')
+                self.assertAlmostEqual(worksheet.column_dimensions['A'].width, 30, delta=1)
+                self.assertTrue(worksheet['A2'].alignment.wrap_text)
+
+                # Low scores are highlighted by one conditional formatting rule per score column, not per-cell fills
+                ranges = sorted(str(rule_range.sqref) for rule_range in worksheet.conditional_formatting)
+                self.assertEqual(ranges, ['D2:D7', 'G2:G7'])
+                self.assertEqual(worksheet['D3'].fill.fill_type, None)
+                for rule_range in worksheet.conditional_formatting:
+                    self.assertIn('<0.85', rule_range.rules[0].formula[0])
+                    if engine == "openpyxl":
+                        self.assertEqual(rule_range.rules[0].dxf.fill.bgColor.rgb, 'FFFFC0CB')
+
+                # Every cell shares one of a handful of style records instead of getting its own
+                self.assertLess(len(workbook._cell_styles), 10)
+
     @patch('os.path.exists', return_value=True)
     @patch('os.getenv')
     def test_get_items_for_answer_matching_with_real_data(self, mock_getenv, mock_exists):
         """Test _get_items_for_answer_matching with real CSV data."""
         # Mock environment variables
-        mock_getenv.side_effect = lambda key: {
-            'CHATAI_BASE_URL': 'http://test-url.com',
-            'CHATAI_API_KEY': 'test-key'
-        }.get(key)
+        mock_getenv.side_effect = _TEST_ENVIRONMENT.get
         
         filler = Questionnaire_Filler(
             reference_file_name=self.reference_csv,
@@ -244,7 +542,8 @@ class TestCSVIntegration(unittest.TestCase):
             reference_answer_col="Answer - Full",
             unanswered_file_name=self.unanswered_csv,
             unanswered_question_col="Question - Full",
-            unanswered_answer_col="Answer - Full"
+            unanswered_answer_col="Answer - Full",
+            **_NO_DISK_CACHES
         )
         
         # First do exact matching to set up reference questions
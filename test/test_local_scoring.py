@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the local answer scoring helpers.
+
+These tests use short hand-picked answer pairs so the expected similarities are obvious.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the src directory to the Python path
+_REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from src.local_scoring import lev_ratio, token_jaccard, local_answer_score
+
+
+class TestLocalScoring(unittest.TestCase):
+    """Test the lev_ratio, token_jaccard and local_answer_score helpers."""
+
+    def test_lev_ratio(self):
+        """Test the normalized edit distance on known pairs."""
+        self.assertEqual(lev_ratio("kitten", "sitting"), 1.0 - 3 / 7)
+        self.assertEqual(lev_ratio("same", "same"), 1.0)
+        self.assertEqual(lev_ratio("", ""), 1.0)
+        self.assertEqual(lev_ratio("abc", ""), 0.0)
+
+    def test_lev_ratio_non_ascii(self):
+        """Test that each non-ASCII character counts as a single edit."""
+        self.assertEqual(lev_ratio("déjà", "deja"), 0.5)
+
+    def test_token_jaccard(self):
+        """Test the word-set overlap ignoring case and punctuation."""
+        self.assertEqual(token_jaccard("Yes, we do", "we do"), 2 / 3)
+        self.assertEqual(token_jaccard("YES", "yes!"), 1.0)
+        self.assertEqual(token_jaccard("Yes", "No"), 0.0)
+
+    def test_local_answer_score(self):
+        """Test that only clear-cut pairs are scored locally."""
+        self.assertEqual(local_answer_score("Yes", "  yes "), 1.0)
+        self.assertEqual(local_answer_score("We Encrypt data\nat rest", "we encrypt data at rest"), 1.0)
+        self.assertEqual(local_answer_score("Our datacenter operates in Frankfurt, Germany only",
+                                            "Employees complete mandatory security training every quarter"), 0.0)
+        self.assertIsNone(local_answer_score("Yes, annually", "Yes, every year"))
+
+    def test_near_miss_pairs_left_to_model(self):
+        """Test that pairs differing in a number, a negation or a synonym are not scored locally."""
+        near_misses = [
+            ("We retain all customer audit logs for a period of 30 days before deletion",
+             "We retain all customer audit logs for a period of 90 days before deletion"),
+            ("N/A", "Not applicable"),
+            ("Yes", "Implemented"),
+            ("True", "Yes"),
+            ("Yes", "No"),
+            ("Access reviews happen quarterly across every business unit",
+             "We don't perform periodic access reviews at this time"),
+            ("Multi factor authentication is enabled for administrators",
+             "Yes, required everywhere via single sign on"),
+        ]
+
+        for a, b in near_misses:
+            with self.subTest(a=a, b=b):
+                self.assertIsNone(local_answer_score(a, b))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the cosine similarity helpers.
+
+These tests use small hand-built embedding matrices so the expected neighbours are obvious.
+"""
+
+import unittest
+import sys
+import os
+import numpy as np
+from unittest.mock import patch
+
+# Add the src directory to the Python path
+_REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+import src.similarity as similarity
+from src.similarity import normalize_rows, cosine_topk
+
+
+class TestCosineTopK(unittest.TestCase):
+    """Test the normalize_rows and cosine_topk helpers."""
+
+    def setUp(self):
+        """Set up query and candidate embeddings."""
+        self.candidates = np.array([
+            [1.0, 0.0],
+            [0.0, 1.0],
+            [1.0, 1.0],
+        ])
+        self.queries = np.array([
+            [2.0, 0.1],   # Closest to candidate 0, then 2
+            [0.0, 3.0],   # Closest to candidate 1, then 2
+        ])
+
+    def test_normalize_rows(self):
+        """Test that rows are scaled to unit length and zero rows stay zero."""
+        normalized = normalize_rows(np.array([[3.0, 4.0], [0.0, 0.0]]))
+        self.assertEqual(normalized.dtype, np.float32)
+        np.testing.assert_allclose(normalized[0], [0.6, 0.8], rtol=1e-6)
+        np.testing.assert_array_equal(normalized[1], [0.0, 0.0])
+
+    def test_topk_order(self):
+        """Test that neighbours are returned most similar first."""
+        indices, scores = cosine_topk(self.queries, self.candidates, 2)
+        np.testing.assert_array_equal(indices, [[0, 2], [1, 2]])
+        self.assertTrue(np.all(scores[:, 0] >= scores[:, 1]))
+
+    def test_k_larger_than_candidates(self):
+        """Test that k is capped at the number of candidates."""
+        indices, scores = cosine_topk(self.queries, self.candidates, 10)
+        self.assertEqual(indices.shape, (2, 3))
+        self.assertEqual(scores.shape, (2, 3))
+
+    def test_empty_inputs(self):
+        """Test that empty queries or candidates return empty results."""
+        indices, _ = cosine_topk(np.empty((0, 2)), self.candidates, 2)
+        self.assertEqual(indices.shape, (0, 0))
+        indices, _ = cosine_topk(self.queries, np.empty((0, 2)), 2)
+        self.assertEqual(indices.shape, (2, 0))
+
+    def test_chunked_queries_match_single_pass(self):
+        """Test that scoring queries in parallel chunks gives the same result as one pass."""
+        rng = np.random.default_rng(0)
+        queries = rng.normal(size=(25, 8))
+        candidates = rng.normal(size=(12, 8))
+        expected_indices, expected_scores = cosine_topk(queries, candidates, 4)
+
+        with patch.object(similarity, 'QUERY_CHUNK_SIZE', 7):
+            indices, scores = cosine_topk(queries, candidates, 4, max_workers=3)
+
+        np.testing.assert_array_equal(indices, expected_indices)
+        np.testing.assert_allclose(scores, expected_scores, rtol=1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()